@@ -1,5 +1,9 @@
+import time
+SCRIPT_START = time.perf_counter()
+
 import streamlit as st
 from chatbot.manager import ChatbotManager
+from chatbot.profiling import report_render_time
 from ui.chat import display_chat_interface
 from ui.sidebar import configure_sidebar
 
@@ -21,5 +25,8 @@ def main():
     configure_sidebar(chatbot_manager)
     display_chat_interface(chatbot_manager)
 
+    # Logged only when CHATBOT_PROFILE=1
+    report_render_time(SCRIPT_START)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Compare chunking throughput of the token-aware chunker against the
+previous RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=4).
+
+Usage:
+    python -m benchmarks.chunking_benchmark input.txt [--format py]
+
+Without an input file a synthetic prose document of --size-mb megabytes is
+generated. Reports MB/s, chunk count and chunk sizes in tokens.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from chatbot.chunking import TokenChunker
+from chatbot.utils import get_encoding
+
+WORDS = (
+    "the dragon knight castle river forest wizard spell ancient library scroll "
+    "mountain village merchant gold silver storm ship harbor council secret"
+).split()
+
+
+def synthetic_text(size_mb: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < size_mb * 1024 * 1024:
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))).capitalize() + "."
+            for _ in range(rng.randint(3, 8))
+        ]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def report(name, chunks, seconds, size_mb):
+    encoding = get_encoding()
+    token_sizes = [len(encoding.encode_ordinary(chunk)) for chunk in chunks]
+    print(
+        f"{name:<28} {size_mb / seconds:7.2f} MB/s   {len(chunks):7d} chunks   "
+        f"tokens mean {statistics.mean(token_sizes):6.1f} max {max(token_sizes):5d}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", help="File to chunk")
+    parser.add_argument("--format", default="txt", help="File format used to pick boundaries")
+    parser.add_argument("--size-mb", type=float, default=5.0, help="Size of the synthetic document")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_text(args.size_mb)
+    size_mb = len(text.encode("utf-8")) / 1024 / 1024
+    print(f"Input: {size_mb:.2f} MB ({args.format})\n")
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=4)
+    start = time.perf_counter()
+    chunks = splitter.split_text(text)
+    report("RecursiveCharacterTextSplitter", chunks, time.perf_counter() - start, size_mb)
+
+    chunker = TokenChunker()
+    start = time.perf_counter()
+    chunks = chunker.chunk_text(text, args.format)
+    report("TokenChunker", chunks, time.perf_counter() - start, size_mb)
+
+
+if __name__ == "__main__":
+    main()
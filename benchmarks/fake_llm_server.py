@@ -0,0 +1,124 @@
+"""
+Local stand-in for the Groq chat completions API, for load-testing the LLM gateway.
+
+Usage:
+    python -m benchmarks.fake_llm_server [--port 8001] [--latency 0.5] [--max-concurrent 2]
+    GROQ_API_BASE=http://127.0.0.1:8001 GROQ_API_KEY=fake streamlit run app.py
+
+Each completion sleeps for --latency seconds and echoes the end of the
+prompt. Like the real provider, requests beyond --max-concurrent in flight
+are rejected with 429 and a Retry-After header.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.5
+    max_concurrent = 2
+    retry_after = 1
+    stats = None
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, payload, headers=None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        stats = self.stats
+        with stats["lock"]:
+            stats["requests"] += 1
+            if stats["in_flight"] >= self.max_concurrent:
+                stats["rejected"] += 1
+                rejected = True
+            else:
+                stats["in_flight"] += 1
+                stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+                rejected = False
+        if rejected:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            return
+
+        try:
+            time.sleep(self.latency)
+            prompt = body["messages"][-1]["content"]
+            content = f"[fake] {prompt[-200:]}"
+            prompt_tokens, completion_tokens = len(prompt.split()), len(content.split())
+            self._send_json(200, {
+                "id": f"chatcmpl-{stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+        finally:
+            with stats["lock"]:
+                stats["in_flight"] -= 1
+
+
+def create_fake_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.5, max_concurrent: int = 2) -> ThreadingHTTPServer:
+    """Create (but do not start) a fake server; port 0 picks a free port"""
+    stats = {"lock": threading.Lock(), "requests": 0, "rejected": 0, "in_flight": 0, "peak_in_flight": 0}
+    handler = type("BoundFakeLLMHandler", (FakeLLMHandler,), {
+        "latency": latency,
+        "max_concurrent": max_concurrent,
+        "stats": stats
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stats = stats
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per completion")
+    parser.add_argument("--max-concurrent", type=int, default=2, help="In-flight requests before answering 429")
+    args = parser.parse_args()
+
+    server = create_fake_server(args.host, args.port, args.latency, args.max_concurrent)
+    print(f"Fake LLM API on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.stats
+        print(f"{stats['requests']} requests, {stats['rejected']} rejected with 429, peak {stats['peak_in_flight']} in flight")
+
+
+if __name__ == "__main__":
+    main()
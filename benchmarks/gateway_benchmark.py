@@ -0,0 +1,88 @@
+"""
+Fire a burst of prompts at a local fake LLM server, with and without the gateway.
+
+Usage:
+    python -m benchmarks.gateway_benchmark [--requests 40] [--unique 10] [--threads 20]
+
+Starts benchmarks.fake_llm_server in-process, points the Groq client at it
+and sends --requests prompts (drawn from --unique distinct ones) from
+--threads concurrent callers. "direct" calls llm.invoke like sessions used
+to; "gateway" goes through chatbot.gateway. For each mode the script
+reports failures, upstream requests, 429s and latency.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_llm_server import create_fake_server
+
+
+def run_mode(name, call, prompts, threads, server):
+    stats = server.stats
+    with stats["lock"]:
+        stats.update(requests=0, rejected=0, peak_in_flight=0)
+
+    latencies = []
+    failures = 0
+
+    def timed(prompt):
+        start = time.perf_counter()
+        try:
+            call(prompt)
+            return time.perf_counter() - start
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for latency in executor.map(timed, prompts):
+            if latency is None:
+                failures += 1
+            else:
+                latencies.append(latency)
+
+    latencies.sort()
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)] if latencies else 0.0
+    print(
+        f"{name:<8} failed {failures:3d}/{len(prompts)}   upstream {stats['requests']:3d}   "
+        f"429s {stats['rejected']:3d}   peak in flight {stats['peak_in_flight']:2d}   "
+        f"mean {statistics.mean(latencies) if latencies else 0.0:6.2f} s   p95 {p95:6.2f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40, help="Prompts sent per mode")
+    parser.add_argument("--unique", type=int, default=10, help="Distinct prompts among them")
+    parser.add_argument("--threads", type=int, default=20, help="Concurrent callers")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake server seconds per completion")
+    parser.add_argument("--server-concurrency", type=int, default=2, help="Fake server in-flight limit before 429")
+    args = parser.parse_args()
+
+    server = create_fake_server(latency=args.latency, max_concurrent=args.server_concurrency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GROQ_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+    # Imported after the environment points at the fake server
+    from chatbot.gateway import LLMGateway
+    from chatbot.manager import ChatbotManager
+    from chatbot.profiles import ProfileStore
+
+    with tempfile.TemporaryDirectory() as profiles_dir:
+        llm = ChatbotManager(profile_store=ProfileStore(profiles_dir)).llm
+    gateway = LLMGateway(max_concurrency=args.server_concurrency, base_backoff=0.25)
+    prompts = [f"Question number {i % args.unique}" for i in range(args.requests)]
+    print(f"{args.requests} prompts ({args.unique} distinct) from {args.threads} threads\n")
+
+    run_mode("direct", llm.invoke, prompts, args.threads, server)
+    run_mode("gateway", lambda prompt: gateway.invoke(llm, prompt), prompts, args.threads, server)
+    print(f"\nGateway metrics: {gateway.metrics()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
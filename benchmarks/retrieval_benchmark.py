@@ -0,0 +1,67 @@
+"""
+Compare dense-only retrieval against hybrid BM25 + FAISS retrieval.
+
+Usage:
+    python -m benchmarks.retrieval_benchmark document.txt queries.txt
+
+queries.txt holds one query per line. For each retrieval mode the script
+reports mean/p95 latency and the mean number of context tokens that would
+be sent to the LLM.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from chatbot.manager import ChatbotManager
+from chatbot.profiles import ProfileStore
+from chatbot.response import count_tokens
+
+
+def run_mode(name, search, queries, repeats):
+    latencies = []
+    context_tokens = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            hits = search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+            context_tokens.append(count_tokens("\n\n".join(doc.page_content for doc, _ in hits)))
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{name:<16} mean {statistics.mean(latencies):8.2f} ms   p95 {p95:8.2f} ms   "
+        f"context {statistics.mean(context_tokens):8.1f} tokens"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("document", help="Text file to index")
+    parser.add_argument("queries", help="File with one query per line")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the query set")
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    # Index into a throwaway profile store so the user's saved profiles are left alone
+    with tempfile.TemporaryDirectory() as profiles_dir:
+        run_benchmark(ChatbotManager(profile_store=ProfileStore(profiles_dir)), args, queries)
+
+
+def run_benchmark(manager, args, queries):
+    stats = manager.create_vectorstore(args.document)
+    print(f"Indexed {stats['total_chunks']} chunks, {len(queries)} queries x {args.repeats} passes\n")
+
+    run_mode("dense k=5", lambda q: manager.vectorstore.similarity_search_with_score(q, k=5), queries, args.repeats)
+    run_mode("hybrid k=3", lambda q: manager.hybrid_search(q, k=3), queries, args.repeats)
+    run_mode("bm25 only k=3", lambda q: manager.bm25_index.search(q, k=3), queries, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
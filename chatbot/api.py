@@ -0,0 +1,62 @@
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+from .manager import ChatbotManager
+from .profiles import DEFAULT_PROFILE, get_profile_store
+from .response import generate_response
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_WORKERS = 4
+
+
+def create_manager(
+    profile_name: str = DEFAULT_PROFILE,
+    mock_llm: bool = False,
+    mock_latency: float = 0.0
+) -> ChatbotManager:
+    """
+    Create a ChatbotManager shared by all workers of a headless process
+
+    Raises:
+        ValueError: If profile_name is not a stored profile (only the default one is created on demand)
+    """
+    if profile_name != DEFAULT_PROFILE and not get_profile_store().exists(profile_name):
+        raise ValueError(f"Unknown profile: {profile_name}")
+
+    manager = ChatbotManager(profile_name)
+    if mock_llm:
+        # Test tooling, only imported when asked for
+        from .mock_llm import MockLLM
+
+        manager.llm = MockLLM(latency=mock_latency)
+
+    # Load the index and LLM up front so worker threads never race to initialize them
+    if manager.vectorstore is None:
+        logger.warning(f"Profile '{profile_name}' has no indexed documents; answering without retrieval")
+    if manager.llm is None:
+        logger.warning("LLM is not available")
+    return manager
+
+
+def answer(manager: ChatbotManager, question: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+    """
+    Answer one question, optionally following earlier messages of a conversation
+
+    Raises:
+        LLMUnavailableError: If no LLM is configured
+        LLMRequestError: If the LLM failed to answer
+    """
+    messages = list(history or []) + [{"role": "user", "content": question}]
+    return generate_response(question, manager, messages, raise_errors=True)
+
+
+def add_manager_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command-line options shared by the HTTP server and the batch CLI"""
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="Character profile to answer as")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent LLM requests")
+    parser.add_argument("--mock-llm", action="store_true", help="Use an offline echo LLM instead of Groq")
+    parser.add_argument("--mock-latency", type=float, default=0.0, help="Seconds the mock LLM sleeps per call")
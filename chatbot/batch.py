@@ -0,0 +1,104 @@
+"""
+Answer a file of questions without the Streamlit UI.
+
+Usage:
+    python -m chatbot.batch questions.txt [-o answers.jsonl] [--workers 4] [--mock-llm]
+
+The input holds one question per line, or JSON lines with a "question"
+field. Answers are written as JSON lines in input order, streaming as
+they complete, with at most a few questions per worker in flight.
+Questions the LLM failed to answer get an "error" field instead of an
+"answer", and the exit status is 1 if there were any.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, TextIO, Tuple
+
+from .api import add_manager_arguments, answer, create_manager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+IN_FLIGHT_PER_WORKER = 2
+
+
+def iter_questions(lines: TextIO) -> Iterator[str]:
+    """Yield questions from plain-text or JSON-lines input"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            yield json.loads(line)["question"]
+        else:
+            yield line
+
+
+def run_batch(manager, questions: Iterator[str], output: TextIO, workers: int) -> Tuple[int, int]:
+    """Answer questions concurrently and write them in input order; returns (questions, failures)"""
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    pending = deque()
+    count = 0
+    failures = 0
+
+    def write_oldest():
+        nonlocal failures
+        question, future = pending.popleft()
+        try:
+            record = {"question": question, "answer": future.result()}
+        except Exception as e:
+            logger.error(f"Error answering {question!r}: {str(e)}")
+            record = {"question": question, "error": str(e)}
+            failures += 1
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-worker") as executor:
+        for question in questions:
+            if len(pending) >= max_in_flight:
+                write_oldest()
+            pending.append((question, executor.submit(answer, manager, question)))
+            count += 1
+        while pending:
+            write_oldest()
+    return count, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questions", help="Question file, or - for stdin")
+    parser.add_argument("-o", "--output", help="Answer file (JSON lines); defaults to stdout")
+    add_manager_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        manager = create_manager(args.profile, mock_llm=args.mock_llm, mock_latency=args.mock_latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    source = sys.stdin if args.questions == "-" else open(args.questions, "r", encoding="utf-8")
+    output = sys.stdout if not args.output else open(args.output, "w", encoding="utf-8")
+    start_time = time.perf_counter()
+    try:
+        count, failures = run_batch(manager, iter_questions(source), output, args.workers)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Answered {count} questions in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f} questions/s)")
+    if failures:
+        logger.error(f"{failures} of {count} questions failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import re
+import logging
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .utils import get_encoding
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+CHUNK_TOKENS = 256
+OVERLAP_TOKENS = 32
+# Long runs of text without blank lines are split at sentence ends once this size is reached
+MAX_PARAGRAPH_CHARS = 16384
+
+CODE_FORMATS = {"py", "java", "cpp", "js"}
+CSV_FORMATS = {"csv"}
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+
+# Lines that open a new top-level definition, per language
+CODE_BOUNDARIES = {
+    "py": re.compile(r"^(?:@|(?:async\s+)?def\s|class\s)"),
+    "js": re.compile(
+        r"^(?:export\s+(?:default\s+)?)?(?:(?:async\s+)?function\b|class\s"
+        r"|(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:function\b|\([^)]*\)\s*=>|\w+\s*=>))"
+    ),
+    "java": re.compile(
+        r"^\s{0,4}(?:@\w+|(?:(?:public|private|protected|static|final|abstract|synchronized)\s+)*"
+        r"(?:class|interface|enum|record)\s|(?:(?:public|private|protected|static|final|abstract|synchronized)\s+)+"
+        r"[\w<>\[\],\s]+\s+\w+\s*\()"
+    ),
+    "cpp": re.compile(
+        r"^(?:template\s*<|(?:class|struct|namespace|enum)\s|[\w:<>\*&~,\s]+[\s\*&]~?[\w:]+\s*\([^;]*$)"
+    ),
+}
+
+
+def iter_prose_segments(lines: Iterable[str]) -> Iterator[str]:
+    """Yield sentences, treating blank lines as hard paragraph breaks"""
+    paragraph: List[str] = []
+    length = 0
+    for line in lines:
+        if line.strip():
+            paragraph.append(line.strip())
+            length += len(paragraph[-1]) + 1
+            if length > MAX_PARAGRAPH_CHARS:
+                # Bound memory and rescanning for text without paragraph breaks
+                *complete, rest = _split_sentences(" ".join(paragraph))
+                if complete:
+                    yield from complete
+                    paragraph, length = [rest], len(rest)
+                else:
+                    yield rest
+                    paragraph, length = [], 0
+            continue
+        if paragraph:
+            yield from _split_sentences(" ".join(paragraph))
+            paragraph, length = [], 0
+    if paragraph:
+        yield from _split_sentences(" ".join(paragraph))
+
+
+def _split_sentences(paragraph: str) -> Iterator[str]:
+    start = 0
+    for match in SENTENCE_END.finditer(paragraph):
+        yield paragraph[start:match.start()]
+        start = match.end()
+    if start < len(paragraph):
+        yield paragraph[start:]
+
+
+def iter_code_segments(lines: Iterable[str], file_format: str) -> Iterator[str]:
+    """Yield code blocks that start at top-level function/class definitions"""
+    boundary = CODE_BOUNDARIES[file_format]
+    block: List[str] = []
+    decorating = False
+    for line in lines:
+        line = line.rstrip("\n")
+        starts_block = bool(boundary.match(line))
+        # Keep decorators/annotations attached to the definition that follows
+        if starts_block and block and not decorating:
+            yield "\n".join(block)
+            block = []
+        decorating = starts_block and line.lstrip().startswith("@")
+        block.append(line)
+    if block:
+        yield "\n".join(block)
+
+
+def iter_csv_segments(lines: Iterable[str]) -> Iterator[str]:
+    """Yield one segment per non-empty CSV row"""
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip(", "):
+            yield line
+
+
+class TokenChunker:
+    """Pack text segments into chunks bounded by a token budget"""
+
+    def __init__(self, chunk_tokens: int = CHUNK_TOKENS, overlap_tokens: int = OVERLAP_TOKENS):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.encoding = get_encoding()
+
+    def _split_oversized(self, tokens: List[int], budget: int) -> Iterator[Tuple[str, int]]:
+        step = budget - self.overlap_tokens
+        for start in range(0, len(tokens), step):
+            window = tokens[start:start + budget]
+            yield self.encoding.decode(window), len(window)
+            if start + budget >= len(tokens):
+                break
+
+    def chunk_segments(
+        self,
+        segments: Iterable[str],
+        separator: str = " ",
+        header: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Greedily pack segments into chunks, each segment encoded exactly once
+
+        Args:
+            segments (Iterable[str]): Text units that should not be split, in order
+            separator (str): String placed between segments within a chunk
+            header (Optional[str]): Text repeated at the top of every chunk (e.g. a CSV header)
+
+        Returns:
+            Iterator[str]: Chunk texts
+        """
+        budget = self.chunk_tokens
+        prefix = ""
+        if header:
+            budget -= len(self.encoding.encode_ordinary(header)) + 1
+            prefix = header + "\n"
+            if budget <= self.overlap_tokens:
+                raise ValueError("header does not fit into chunk_tokens")
+
+        # Every segment after the first in a chunk also costs its separator
+        separator_tokens = len(self.encoding.encode_ordinary(separator))
+        parts: List[Tuple[str, int]] = []
+        size = 0
+
+        for segment in segments:
+            tokens = self.encoding.encode_ordinary(segment)
+            if len(tokens) > budget:
+                if parts:
+                    yield prefix + separator.join(text for text, _ in parts)
+                    parts, size = [], 0
+                if "\n" in segment:
+                    # Fall back to line boundaries inside large code blocks
+                    yield from self.chunk_segments(segment.split("\n"), separator="\n", header=header)
+                else:
+                    for text, _ in self._split_oversized(tokens, budget):
+                        yield prefix + text
+                continue
+
+            if parts and size + separator_tokens + len(tokens) > budget:
+                yield prefix + separator.join(text for text, _ in parts)
+                # Carry trailing segments forward as overlap
+                carried: List[Tuple[str, int]] = []
+                carried_size = 0
+                for text, count in reversed(parts):
+                    cost = count + separator_tokens
+                    if carried_size + cost > self.overlap_tokens or carried_size + cost + len(tokens) > budget:
+                        break
+                    carried.insert(0, (text, count))
+                    carried_size += cost
+                parts, size = carried, carried_size
+
+            size += len(tokens) + (separator_tokens if parts else 0)
+            parts.append((segment, len(tokens)))
+
+        if parts:
+            yield prefix + separator.join(text for text, _ in parts)
+
+    def chunk_lines(self, lines: Iterable[str], file_format: str = "txt") -> Iterator[str]:
+        """Chunk a stream of lines using the boundaries appropriate for the file format"""
+        file_format = file_format.lower()
+        if file_format in CODE_FORMATS:
+            return self.chunk_segments(iter_code_segments(lines, file_format), separator="\n")
+        if file_format in CSV_FORMATS:
+            rows = iter_csv_segments(lines)
+            header = next(rows, None)
+            if header is None:
+                return iter(())
+            return self.chunk_segments(rows, separator="\n", header=header)
+        return self.chunk_segments(iter_prose_segments(lines))
+
+    def chunk_text(self, text: str, file_format: str = "txt") -> List[str]:
+        """Chunk an in-memory string"""
+        return list(self.chunk_lines(text.splitlines(), file_format))
@@ -0,0 +1,103 @@
+import re
+import logging
+from typing import Any, List, Tuple, Set
+
+from .retrieval import tokenize
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DUPLICATE_THRESHOLD = 0.8
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 300
+SHINGLE_SIZE = 3
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> Set[Tuple[str, ...]]:
+    """Word n-grams used for near-duplicate detection"""
+    words = text.lower().split()
+    if len(words) <= size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _overlap_length(previous: str, current: str) -> int:
+    """Length of the longest suffix of previous that is also a prefix of current"""
+    limit = min(len(previous), len(current), MAX_OVERLAP_CHARS)
+    for length in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(current[:length]):
+            return length
+    return 0
+
+
+def extract_relevant_sentences(text: str, query: str) -> str:
+    """Keep only the sentences of a chunk that share terms with the query"""
+    query_terms = set(tokenize(query))
+    sentences = [s.strip() for s in SENTENCE_PATTERN.split(text) if s.strip()]
+    relevant = [s for s in sentences if query_terms & set(tokenize(s))]
+    # Fall back to the whole chunk when nothing matches lexically
+    return " ".join(relevant) if relevant else text
+
+
+def compress_context(
+    docs_with_scores: List[Tuple[Any, float]],
+    query: str,
+    duplicate_threshold: float = DUPLICATE_THRESHOLD,
+    extract_sentences: bool = False
+) -> List[Tuple[str, float]]:
+    """
+    Post-process retrieved chunks before they are added to the prompt
+
+    Weak hits are expected to be filtered by each retriever before fusion;
+    fused scores say how many retrievers agree, not how relevant a hit is.
+
+    Args:
+        docs_with_scores (List[Tuple[Any, float]]): Retrieved documents, best first
+        query (str): User query used for retrieval
+        duplicate_threshold (float): Shingle Jaccard similarity above which a chunk is a duplicate
+        extract_sentences (bool): Keep only query-relevant sentences of each chunk
+
+    Returns:
+        List[Tuple[str, float]]: Compressed chunk texts with their retrieval scores
+    """
+    if not docs_with_scores:
+        return []
+
+    kept: List[Tuple[str, float]] = []
+    kept_shingles: List[Set] = []
+
+    for doc, score in docs_with_scores:
+        text = doc.page_content.strip()
+
+        # Skip chunks already contained in, or nearly identical to, a kept chunk
+        shingles = _shingles(text)
+        if any(text in kept_text for kept_text, _ in kept) or any(
+            _jaccard(shingles, other) >= duplicate_threshold for other in kept_shingles
+        ):
+            logger.info("Dropping near-duplicate chunk")
+            continue
+
+        # Trim text repeated from the splitter's chunk overlap
+        for kept_text, _ in kept:
+            overlap = _overlap_length(kept_text, text)
+            if overlap:
+                text = text[overlap:].lstrip()
+                break
+
+        if extract_sentences:
+            text = extract_relevant_sentences(text, query)
+
+        if text:
+            kept.append((text, score))
+            kept_shingles.append(shingles)
+
+    return kept
@@ -0,0 +1,81 @@
+import io
+import csv
+import logging
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from .chunking import TokenChunker, CHUNK_TOKENS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+CSV_ENCODING = "utf-8-sig"  # Also strips the BOM written by spreadsheet exports
+
+
+def _row_formatter() -> Callable[[List[str]], str]:
+    """Serialize parsed rows back to CSV text, re-quoting fields that contain commas, quotes or newlines"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="")
+
+    def format_row(row: List[str]) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        return buffer.getvalue()
+
+    return format_row
+
+
+def _iter_rows(reader, stats: Dict[str, Any], format_row: Callable[[List[str]], str]) -> Iterator[str]:
+    for row in reader:
+        if any(field.strip() for field in row):
+            stats["rows"] += 1
+            yield format_row(row)
+
+
+def iter_csv_documents(
+    file: BinaryIO,
+    source: str = "upload.csv",
+    chunk_tokens: int = CHUNK_TOKENS,
+    encoding: str = CSV_ENCODING,
+    stats: Optional[Dict[str, Any]] = None
+) -> Iterator[Any]:
+    """
+    Stream a binary CSV file into Documents of rows, each starting with the header row
+
+    The file is decoded and parsed incrementally, so memory use does not
+    depend on the number of rows.
+
+    Args:
+        file (BinaryIO): Binary file object positioned at the start of the CSV
+        source (str): Source name stored in document metadata
+        chunk_tokens (int): Maximum tokens per document, header included
+        encoding (str): Text encoding of the file
+        stats (Optional[Dict[str, Any]]): Filled with "rows" and "documents" counts while iterating
+
+    Returns:
+        Iterator[Any]: LangChain Documents
+    """
+    from langchain_core.documents import Document
+
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, documents=0)
+
+    text_stream = io.TextIOWrapper(file, encoding=encoding, errors="replace", newline="")
+    try:
+        reader = csv.reader(text_stream)
+        header = next((row for row in reader if any(field.strip() for field in row)), None)
+        if header is None:
+            return
+
+        # Rows are not repeated as overlap; a row longer than a whole document is
+        # split into several, each still starting with the header
+        chunker = TokenChunker(chunk_tokens=chunk_tokens, overlap_tokens=0)
+        format_row = _row_formatter()
+        rows = _iter_rows(reader, stats, format_row)
+        for text in chunker.chunk_segments(rows, separator="\n", header=format_row(header)):
+            stats["documents"] += 1
+            yield Document(page_content=text, metadata={"source": source})
+    finally:
+        # Leave the caller's file object open
+        text_stream.detach()
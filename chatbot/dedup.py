@@ -0,0 +1,146 @@
+import re
+import json
+import base64
+import random
+import hashlib
+import logging
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+SHINGLE_SIZE = 2
+NUM_PERMUTATIONS = 64
+# Chunks whose estimated word-bigram Jaccard similarity reaches this are near-duplicates.
+# Calibrated on 256-token prose chunks: ~5% of words changed is caught >95% of the time,
+# a footer differing only by year always is, and no flagged pair was unrelated text.
+JACCARD_THRESHOLD = 0.7
+# 16 bands of 4 rows make a pair at the threshold a candidate ~99% of the time;
+# candidates are then checked against the threshold using the full signatures
+BAND_COUNT = 16
+BAND_ROWS = NUM_PERMUTATIONS // BAND_COUNT
+FORMAT_VERSION = 2
+
+MASK64 = (1 << 64) - 1
+WORD_PATTERN = re.compile(r"\w+")
+
+# Fixed seed so signatures stay comparable with those persisted by earlier runs
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERMUTATIONS)]
+
+Signature = Tuple[int, ...]
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str, shingle_size: int = SHINGLE_SIZE) -> set:
+    """Hashed word shingles of a text"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= shingle_size:
+        return {_hash64(" ".join(words))}
+    return {_hash64(" ".join(words[i:i + shingle_size])) for i in range(len(words) - shingle_size + 1)}
+
+
+def minhash(text: str) -> Signature:
+    """MinHash signature of a text's word shingles (multiply-shift permutations, 32-bit values)"""
+    hashes = shingles(text)
+    return tuple(
+        min(((a * h + b) & MASK64) >> 32 for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Fraction of agreeing signature positions, an unbiased estimate of Jaccard similarity"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class FingerprintIndex:
+    """MinHash signatures of indexed chunks, LSH-banded for fast near-duplicate lookup"""
+
+    def __init__(self, threshold: float = JACCARD_THRESHOLD):
+        self.threshold = threshold
+        self.signatures: List[Signature] = []
+        self._bands: List[Dict[Signature, List[int]]] = [defaultdict(list) for _ in range(BAND_COUNT)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @staticmethod
+    def _band_keys(signature: Signature):
+        for band in range(BAND_COUNT):
+            yield band, signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+
+    def add(self, signature: Signature) -> None:
+        position = len(self.signatures)
+        for band, key in self._band_keys(signature):
+            self._bands[band][key].append(position)
+        self.signatures.append(signature)
+
+    def find_near_duplicate(self, signature: Signature) -> Optional[int]:
+        """Return the position of a stored signature at or above the similarity threshold, if any"""
+        checked = set()
+        for band, key in self._band_keys(signature):
+            for position in self._bands[band].get(key, ()):
+                if position in checked:
+                    continue
+                checked.add(position)
+                if estimate_jaccard(self.signatures[position], signature) >= self.threshold:
+                    return position
+        return None
+
+    def check_and_add(self, text: str) -> bool:
+        """Return True if text nearly duplicates an indexed chunk, otherwise index it"""
+        signature = minhash(text)
+        if self.find_near_duplicate(signature) is not None:
+            return True
+        self.add(signature)
+        return False
+
+    def merge_from(self, other: "FingerprintIndex") -> None:
+        """Add all signatures of another index"""
+        for signature in other.signatures:
+            self.add(signature)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "threshold": self.threshold,
+                "signatures": [
+                    base64.b64encode(array("I", signature).tobytes()).decode("ascii")
+                    for signature in self.signatures
+                ]
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "FingerprintIndex":
+        """
+        Load saved signatures
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported fingerprint format in {path}")
+        index = cls(data.get("threshold", JACCARD_THRESHOLD))
+        for encoded in data["signatures"]:
+            signature = array("I")
+            signature.frombytes(base64.b64decode(encoded))
+            index.add(tuple(signature))
+        return index
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> "FingerprintIndex":
+        """Fingerprint already indexed texts, keeping duplicates among them"""
+        index = cls()
+        for text in texts:
+            index.add(minhash(text))
+        return index
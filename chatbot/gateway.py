@@ -0,0 +1,245 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .utils import get_encoding
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 6000))
+MAX_RETRIES = 4
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+RETRYABLE_STATUS_CODES = {429, 503}
+WAIT_SAMPLES = 1000
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of a provider error, if it carries one"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds the provider asked us to wait, or 0"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an LLM error is a transient rate-limit or overload worth retrying"""
+    if _status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    return "RateLimit" in type(error).__name__
+
+
+class TokenBucket:
+    """Tokens-per-minute budget that refills continuously"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: int) -> None:
+        """Block until `tokens` can be spent; requests above the capacity wait for a full bucket"""
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def available(self) -> int:
+        with self._lock:
+            self._refill()
+            return int(self._tokens)
+
+    def refund(self, tokens: int) -> None:
+        """Return tokens that were reserved but not used"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+class LLMGateway:
+    """
+    Process-wide front door for LLM calls
+
+    Every chat reply and summary goes through one gateway, which caps the
+    number of concurrent upstream requests, spends a tokens-per-minute
+    budget before each attempt, retries rate-limit errors with jittered
+    exponential backoff, and lets identical prompts that are already in
+    flight share a single upstream call.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        tokens_per_minute: int = TOKENS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+        base_backoff: float = BASE_BACKOFF_SECONDS,
+        max_backoff: float = MAX_BACKOFF_SECONDS
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(tokens_per_minute)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._counters = {
+            "requests": 0,
+            "upstream_calls": 0,
+            "coalesced": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "queued": 0,
+            "running": 0
+        }
+
+    @staticmethod
+    def _request_key(llm, prompt: str) -> Tuple:
+        """Identical prompts to identically configured models share one call"""
+        model = getattr(llm, "model_name", None)
+        if model is None:
+            return (id(llm), prompt)
+        return (
+            type(llm).__name__, model,
+            getattr(llm, "temperature", None), getattr(llm, "max_tokens", None),
+            prompt
+        )
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += delta
+
+    def invoke(self, llm, prompt: str):
+        """
+        Call llm.invoke(prompt) within the process-wide budgets
+
+        Returns:
+            The model's response, shared with any identical concurrent request
+
+        Raises:
+            Exception: The provider error once retries are exhausted
+        """
+        key = self._request_key(llm, prompt)
+        with self._lock:
+            self._counters["requests"] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(self._call(llm, prompt))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def _call(self, llm, prompt: str):
+        reserved = len(get_encoding().encode(str(prompt))) + (getattr(llm, "max_tokens", None) or 0)
+
+        self._count("queued")
+        start_time = time.perf_counter()
+        try:
+            self.bucket.acquire(reserved)
+            self._slots.acquire()
+        finally:
+            self._count("queued", -1)
+        with self._lock:
+            self._waits.append(time.perf_counter() - start_time)
+
+        attempt = 0
+        try:
+            while True:
+                self._count("upstream_calls")
+                self._count("running")
+                try:
+                    response = llm.invoke(prompt)
+                    break
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                        self._count("failures")
+                        raise
+                    self._count("rate_limited")
+                    # Full jitter, but never earlier than the provider asked for
+                    delay = max(
+                        random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt)),
+                        _retry_after(e)
+                    )
+                finally:
+                    self._count("running", -1)
+
+                attempt += 1
+                self._count("retries")
+                logger.warning(f"LLM rate limited, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                # Free the slot while backing off so other requests are not held up
+                self._slots.release()
+                time.sleep(delay)
+                # A retry resends the whole prompt, so it spends budget like a new call
+                self.bucket.acquire(reserved)
+                self._slots.acquire()
+        finally:
+            self._slots.release()
+
+        # Give back the part of the reservation the call did not use
+        usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        if usage.get("total_tokens"):
+            self.bucket.refund(max(reserved - usage["total_tokens"], 0))
+        return response
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, concurrency and wait times"""
+        with self._lock:
+            metrics = dict(self._counters)
+            waits = sorted(self._waits)
+        metrics["max_concurrency"] = self.max_concurrency
+        metrics["tokens_available"] = self.bucket.available()
+        if waits:
+            metrics["wait_seconds_mean"] = round(sum(waits) / len(waits), 4)
+            metrics["wait_seconds_p95"] = round(waits[max(int(len(waits) * 0.95) - 1, 0)], 4)
+            metrics["wait_seconds_max"] = round(waits[-1], 4)
+        return metrics
+
+
+@lru_cache(maxsize=None)
+def get_gateway() -> LLMGateway:
+    """Process-wide gateway, so all sessions share the concurrency and token budgets"""
+    return LLMGateway()
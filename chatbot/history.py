@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import logging
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+HISTORY_DIR = "conversations"
+COMPACT_EVERY = 200
+CONVERSATION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Open stores by log path; entries go away once no session holds the store
+_open_stores: "weakref.WeakValueDictionary[str, ConversationStore]" = weakref.WeakValueDictionary()
+_open_stores_lock = threading.Lock()
+
+
+class ConversationStore:
+    """
+    Append-only on-disk log of one conversation's messages
+
+    Each line of the log is a JSON record: either a message
+    ({"role": ..., "content": ...}) or a clear marker ({"op": "clear"}).
+    Only byte offsets of live messages are kept in memory, so reading a
+    window of messages costs one seek per message regardless of how long
+    the conversation is. Cleared and corrupt records are dropped by
+    periodic compaction.
+    """
+
+    def __init__(self, conversation_id: str, directory: str = HISTORY_DIR, compact_every: int = COMPACT_EVERY):
+        if not CONVERSATION_ID_PATTERN.match(conversation_id):
+            raise ValueError(f"Invalid conversation id: {conversation_id!r}")
+        os.makedirs(directory, exist_ok=True)
+        self.conversation_id = conversation_id
+        self.path = os.path.join(directory, f"{conversation_id}.jsonl")
+        self.summary_path = os.path.join(directory, f"{conversation_id}.summary.json")
+        self.compact_every = compact_every
+        # Bumped by every clear, so writers can tell their view of the log is outdated
+        self.epoch = 0
+        self._offsets: List[int] = []
+        self._dead_records = 0
+        self._writes_since_compaction = 0
+        self._lock = threading.Lock()
+        self._load_offsets()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _load_offsets(self) -> None:
+        """Scan the log once to find the live message records"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A partially written last line from an interrupted append
+                    self._dead_records += 1
+                else:
+                    if record.get("op") == "clear":
+                        self._dead_records += len(self._offsets) + 1
+                        self._offsets = []
+                    else:
+                        self._offsets.append(offset)
+                offset += len(line)
+
+        # Drop an unterminated last line so the next append starts on a fresh line
+        if offset and not line.endswith(b"\n"):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset - len(line))
+            if self._offsets and self._offsets[-1] == offset - len(line):
+                self._offsets.pop()
+            else:
+                self._dead_records -= 1
+
+    def _write(self, record: Dict) -> int:
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._writes_since_compaction += 1
+        return offset
+
+    def append(self, role: str, content: str) -> None:
+        """Append a message to the conversation"""
+        with self._lock:
+            self._offsets.append(self._write({"role": role, "content": content}))
+            self._maybe_compact()
+
+    def clear(self) -> None:
+        """Remove all messages from the conversation"""
+        with self._lock:
+            self._write({"op": "clear"})
+            self._dead_records += len(self._offsets) + 1
+            self._offsets = []
+            self.epoch += 1
+            if os.path.exists(self.summary_path):
+                os.remove(self.summary_path)
+            self._maybe_compact()
+
+    def read(self, start: int, end: int) -> List[Dict[str, str]]:
+        """Return messages [start, end) in order"""
+        with self._lock:
+            offsets = self._offsets[max(start, 0):end]
+            if not offsets:
+                return []
+            messages = []
+            with open(self.path, "rb") as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    messages.append(json.loads(f.readline()))
+            return messages
+
+    def tail(self, count: int) -> List[Dict[str, str]]:
+        """Return the most recent messages"""
+        return self.read(len(self) - count, len(self))
+
+    def read_summary(self) -> Tuple[str, int]:
+        """Return the persisted (summary, number of leading messages it covers)"""
+        try:
+            with open(self.summary_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data["summary"], int(data["covered"])
+        except FileNotFoundError:
+            return "", 0
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable summary of conversation {self.conversation_id}: {str(e)}")
+            return "", 0
+
+    def write_summary(self, summary: str, covered: int, epoch: Optional[int] = None) -> bool:
+        """
+        Persist the rolling summary next to the log
+
+        Returns False without writing if `epoch` is given and the
+        conversation has been cleared since, so a summary of the old
+        messages cannot outlive the clear.
+        """
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return False
+            temp_path = self.summary_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"summary": summary, "covered": covered}, f, ensure_ascii=False)
+            os.replace(temp_path, self.summary_path)
+            return True
+
+    def _maybe_compact(self) -> None:
+        if self._dead_records and self._writes_since_compaction >= self.compact_every:
+            self._compact()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the live messages"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        temp_path = self.path + ".tmp"
+        new_offsets = []
+        with open(self.path, "rb") as src, open(temp_path, "wb") as dst:
+            for offset in self._offsets:
+                src.seek(offset)
+                new_offsets.append(dst.tell())
+                dst.write(src.readline())
+        os.replace(temp_path, self.path)
+        logger.info(f"Compacted conversation {self.conversation_id}: dropped {self._dead_records} records")
+        self._offsets = new_offsets
+        self._dead_records = 0
+        self._writes_since_compaction = 0
+
+
+def open_conversation_store(conversation_id: str, directory: str = HISTORY_DIR) -> ConversationStore:
+    """
+    Return the process-wide store of a conversation
+
+    Sessions resuming the same conversation (e.g. two tabs with the same
+    URL) must share one store: each store caches byte offsets into the log
+    and would misread it after another instance appends, clears or compacts.
+    """
+    path = os.path.join(directory, f"{conversation_id}.jsonl")
+    with _open_stores_lock:
+        store = _open_stores.get(path)
+        if store is None:
+            store = ConversationStore(conversation_id, directory)
+            _open_stores[path] = store
+        return store
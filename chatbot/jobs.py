@@ -0,0 +1,137 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+STAGES = ("queued", "extracted", "chunked", "embedded", "indexed")
+MAX_WORKERS = 2
+MAX_ACTIVE_JOBS = 8
+MAX_FINISHED_JOBS = 50
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class IngestJob:
+    """State of one background ingestion, safe to read from any thread"""
+
+    def __init__(self, description: str):
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.status = "queued"  # queued, running, done, failed, cancelled
+        self.stage = "queued"
+        self.counters: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def fraction(self) -> float:
+        """Progress through the stages, from 0.0 to 1.0"""
+        return STAGES.index(self.stage) / (len(STAGES) - 1)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+
+    def report(self, stage: str, **counters) -> None:
+        """Record progress; raises JobCancelled if the job should stop"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        self.stage = stage
+        self.counters.update(counters)
+
+
+class JobManager:
+    """Bounded worker pool running ingestion jobs in the background"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_active: int = MAX_ACTIVE_JOBS):
+        self.max_active = max_active
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest-worker")
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, description: str, fn: Callable[..., Dict[str, Any]], *args) -> IngestJob:
+        """
+        Queue fn(job, *args) for background execution
+
+        Raises:
+            RuntimeError: If too many jobs are already queued or running
+        """
+        with self._lock:
+            if sum(job.active for job in self._jobs.values()) >= self.max_active:
+                raise RuntimeError("Too many ingestion jobs in progress, try again later")
+            job = IngestJob(description)
+            self._jobs[job.id] = job
+            self._trim_finished()
+            job.future = self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: IngestJob, fn: Callable[..., Dict[str, Any]], args: tuple) -> None:
+        if job.cancel_requested:
+            job.status = "cancelled"
+            return
+        job.status = "running"
+        try:
+            job.result = fn(job, *args)
+            # The index is committed by now, so a late cancel request no longer applies
+            job.stage = "indexed"
+            job.counters.update((key, value) for key, value in job.result.items() if isinstance(value, int))
+            job.status = "done"
+            logger.info(f"Job {job.id} ({job.description}) finished")
+        except JobCancelled:
+            job.status = "cancelled"
+            logger.info(f"Job {job.id} ({job.description}) cancelled")
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Job {job.id} ({job.description}) failed: {str(e)}")
+
+    def _trim_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; returns False for unknown or finished jobs"""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+        job.cancel()
+        return True
+
+
+@lru_cache(maxsize=None)
+def get_job_manager() -> JobManager:
+    """Process-wide job manager, so all sessions share the worker pool"""
+    return JobManager()
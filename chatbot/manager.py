@@ -1,24 +1,17 @@
 import logging
 import os
-from typing import Dict, Any, Optional
-from langchain_groq import ChatGroq
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.document_loaders import TextLoader
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.chains import create_retrieval_chain
-from langchain.chains import (
-    create_history_aware_retriever,
-    create_retrieval_chain,
-)
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-
-from langchain.vectorstores import FAISS
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Callable
 from dotenv import load_dotenv
 import re
 import json
 import getpass
+import time
+from .retrieval import BM25Index, reciprocal_rank_fusion, CHUNK_ID_KEY, MAX_DENSE_DISTANCE, MIN_BM25_IDF_FRACTION
+from .chunking import TokenChunker
+from .summary import ConversationSummarizer
+from .profiles import get_profile_store, ProfileStore, DEFAULT_PROFILE
+from .utils import load_embedding_model, iter_batches
+from .dedup import FingerprintIndex, minhash
 
 
 # Configure logging
@@ -27,36 +20,81 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 HUGGINGFACE_API_KEY = os.getenv("HF_TOKEN")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Point the Groq client at another endpoint, e.g. a local fake server for load tests
+GROQ_API_BASE = os.getenv("GROQ_API_BASE")
 CONFIG_FILE = "chatbot_config.json"
 
 
-if "GROQ_API_KEY" not in os.environ:
-    os.environ["GROQ_API_KEY"] = GROQ_API_KEY
-
-CONFIG_FILE = "chatbot_config.json"
-
-
-
 # Constants
 MODEL = "llama3-70b-8192"
+EMBED_BATCH_SIZE = 256
 
 class ChatbotManager:
-    def __init__(self):
-        """Initialize the ChatbotManager with default configuration"""
-        self.vectorstore = None
-        self.llm = None
-        self.qa_chain = None
-        self.retriever = None
+    def __init__(self, profile_name: str = DEFAULT_PROFILE, profile_store: Optional[ProfileStore] = None):
+        """Initialize the ChatbotManager with the given character profile, from the shared store by default"""
+        self.profiles = profile_store or get_profile_store()
+        self.profile_name = profile_name
+        self._llm = None
+        self._summarizer = None
         self.load_config()
-        self._initialize_llm()
+
+    @property
+    def vectorstore(self):
+        """Vector store of the active profile, shared with every session using the profile"""
+        return self._profile_index()[0]
+
+    @property
+    def bm25_index(self):
+        """BM25 index of the active profile"""
+        return self._profile_index()[1]
+
+    @property
+    def fingerprints(self):
+        """Near-duplicate fingerprints of the active profile's chunks"""
+        return self._profile_index()[2]
+
+    @property
+    def llm(self):
+        """LLM client, created on first use so startup does not pay for it"""
+        if self._llm is None:
+            self._initialize_llm()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value) -> None:
+        self._llm = value
+
+    @property
+    def embedding_model(self):
+        """Sentence-transformer embeddings, loaded on first ingestion"""
+        return load_embedding_model()
     
+    @property
+    def summarizer(self) -> ConversationSummarizer:
+        """Background summarizer that keeps a rolling summary per conversation"""
+        if self._summarizer is None:
+            self._summarizer = ConversationSummarizer(self.llm)
+        elif self._summarizer.llm is None:
+            # Retry an LLM that failed to initialize earlier
+            self._summarizer.llm = self.llm
+        return self._summarizer
+
     def load_config(self) -> None:
-        """Load configuration from file or create default"""
-        if os.path.exists(CONFIG_FILE):
+        """Load the active profile's configuration, or create it"""
+        if self.profiles.exists(self.profile_name):
+            try:
+                self.config = self.profiles.load_config(self.profile_name)
+                logger.info(f"Configuration of profile '{self.profile_name}' loaded successfully")
+            except json.JSONDecodeError:
+                logger.error(f"Invalid JSON in configuration of profile '{self.profile_name}'")
+                self.create_default_config()
+        elif self.profile_name == DEFAULT_PROFILE and os.path.exists(CONFIG_FILE):
+            # Seed the default profile from the single-character config file
             try:
                 with open(CONFIG_FILE, "r") as f:
                     self.config = json.load(f)
-                    logger.info("Configuration loaded successfully")
+                self.save_config()
+                logger.info(f"Configuration loaded from {CONFIG_FILE}")
             except json.JSONDecodeError:
                 logger.error(f"Invalid JSON in {CONFIG_FILE}")
                 self.create_default_config()
@@ -74,16 +112,22 @@ class ChatbotManager:
             "abilities": "Natural language understanding, knowledge retrieval, and personalized interactions.",
             "additional_info": "",
             "temperature": 0.7,
-            "response_length": 500
+            "response_length": 500,
+            "extract_relevant_sentences": False
         }
         self.save_config()
     
     def _initialize_llm(self):
         """Initialize the LLM with current configuration"""
         try:
+            from langchain_groq import ChatGroq
+
             self.llm = ChatGroq(
                 model=MODEL,
-                api_key=GROQ_API_KEY, 
+                api_key=GROQ_API_KEY,
+                base_url=GROQ_API_BASE,
+                # Rate-limit retries are handled process-wide by the LLM gateway
+                max_retries=0,
                 temperature=self.config.get("temperature", 0.7),
                 max_tokens=self.config.get("response_length", 500)
             )
@@ -92,59 +136,57 @@ class ChatbotManager:
             logger.error(f"Error initializing LLM: {str(e)}")
             self.llm = None
 
-    def _initialize_qa_chain(self):
-        """Initialize the QA chain if vectorstore is available"""
-        if not self.vectorstore or not self.llm:
-            logger.warning("Cannot initialize QA chain: vectorstore or LLM not available")
-            return False
-        
-        try:
-            self.retriever = self.vectorstore.as_retriever(search_type="similarity_score_threshold",search_kwargs={"score_threshold": 0.8,"k": 3})
-            
-            system_prompt = (
-                "Refer to the documents to answer the question when needed. "
-                "If you don't know the answer, say you don't know. "
-                "{context}"
-            )
-            prompt = ChatPromptTemplate.from_messages(
-                [
-                    ("system", system_prompt),
-                    ("human", "{input}"),
-                ]
-            )
-            question_answer_chain = create_stuff_documents_chain(self.llm, prompt)
-
-            self.qa_chain = create_retrieval_chain(self.retriever,question_answer_chain)
-
-
-            logger.info("QA chain initialized successfully")
-            return True
-        except Exception as e:
-            logger.error(f"Error initializing QA chain: {str(e)}")
-            self.qa_chain = None
-            return False
-    
     def update_llm_parameters(self):
         """Update LLM parameters based on current configuration"""
-        if self.llm:
-            self.llm.temperature = self.config.get("temperature", 0.7)
-            self.llm.max_tokens = self.config.get("response_length", 500)
+        # An LLM that has not been created yet picks up the config when first used
+        if self._llm:
+            self._llm.temperature = self.config.get("temperature", 0.7)
+            self._llm.max_tokens = self.config.get("response_length", 500)
             logger.info("LLM parameters updated")
-        else:
-            self._initialize_llm()
     
     def save_config(self) -> bool:
         """Save the current configuration and update LLM parameters"""
         try:
-            # In a real application, you might save to a file or database
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(self.config, f, indent=2)
-            logger.info("Configuration saved successfully")
+            self.profiles.save_config(self.profile_name, self.config)
+            logger.info(f"Configuration of profile '{self.profile_name}' saved successfully")
             return True
         except Exception as e:
             logger.error(f"Error saving configuration: {str(e)}")
             return False
     
+    def _profile_index(self) -> Tuple[Any, Any, Any]:
+        """
+        (vectorstore, bm25_index, fingerprints) of the active profile, from memory or disk
+
+        Looked up in the profile store on every use rather than kept on the
+        session, so updates by other sessions are seen at once and evicted
+        indexes are not held in memory.
+        """
+        try:
+            return self.profiles.get_index(self.profile_name)
+        except Exception as e:
+            logger.error(f"Error loading index of profile '{self.profile_name}': {str(e)}")
+            return None, None, None
+
+    def switch_profile(self, profile_name: str) -> None:
+        """Make another stored profile the active one"""
+        if profile_name == self.profile_name:
+            return
+        if not self.profiles.exists(profile_name):
+            raise ValueError(f"Unknown profile: {profile_name}")
+
+        self.profile_name = profile_name
+        self.load_config()
+        self.update_llm_parameters()
+        logger.info(f"Switched to profile '{profile_name}'")
+
+    def create_profile(self, profile_name: str, config: Optional[Dict[str, Any]] = None) -> None:
+        """Store a new profile, starting from the given or the current configuration"""
+        if self.profiles.exists(profile_name):
+            raise ValueError(f"Profile already exists: {profile_name}")
+        self.profiles.save_config(profile_name, dict(config or self.config))
+        logger.info(f"Created profile '{profile_name}'")
+
     def update_config(self, new_config: Dict[str, Any]) -> None:
         """Update the configuration with new values and update LLM parameters"""
         for key, value in new_config.items():
@@ -155,30 +197,185 @@ class ChatbotManager:
         self.update_llm_parameters()
         logger.info("Configuration updated")
     
-    def create_vectorstore(self, file_path: str) -> None:
-        """Create vector store from document"""
-        try:
-            loader = TextLoader(file_path, encoding="utf-8")
-            documents = loader.load()
-            logger.info(f"Document length: {len(documents[0].page_content)} characters")
-  
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=4)
-            
-            docs = text_splitter.split_documents(documents)
+    def ingest_documents(
+        self,
+        documents: Iterable[Any],
+        append: bool = False,
+        batch_size: int = EMBED_BATCH_SIZE,
+        progress: Optional[Callable[..., None]] = None,
+        profile_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Index a stream of documents, replacing or extending the profile's index
 
-            logger.info("Chunks: "+str(len(docs)))
-            
+        Documents are embedded and indexed in batches as they arrive, so the
+        source never has to be held in memory as a whole. Chunks that nearly
+        duplicate an already indexed chunk are dropped before embedding. New
+        chunks go into a separate delta index, merged into the profile's index
+        only once it is complete, so readers never see a partial index, an
+        aborted run changes nothing, and appending costs time proportional to
+        the new chunks rather than the whole index.
+
+        Args:
+            documents (Iterable[Any]): LangChain Documents, possibly a generator
+            append (bool): Add to the profile's index instead of replacing it
+            batch_size (int): Documents embedded per call
+            progress (Optional[Callable[..., None]]): Called as progress(stage, **counters)
+                for the "chunked" and "embedded" stages; may raise to abort until the
+                index is saved, after which the run always completes
+            profile_name (Optional[str]): Profile to index into; defaults to the active one.
+                Background jobs pass the profile that was active when they were queued
+
+        Returns:
+            Dict[str, Any]: Ingestion statistics
+        """
+        from langchain.vectorstores import FAISS
 
-            embedding_model = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
+        progress = progress or (lambda stage, **counters: None)
+        profile_name = profile_name or self.profile_name
+        start_time = time.perf_counter()
+
+        # One ingestion per profile at a time, so concurrent appends cannot lose each other's chunks
+        with self.profiles.ingest_lock(profile_name):
+            base_vectorstore, base_bm25, base_fingerprints = (
+                self.profiles.get_index(profile_name) if append else (None, None, None)
             )
-            
-            self.vectorstore = FAISS.from_documents(docs, embedding_model)
-            self._initialize_qa_chain()
-            logger.info(f"Vector store created with {len(docs)} documents")
-        
+            # Only ingestion reads or writes fingerprints, and it holds the ingest lock
+            base_fingerprints = base_fingerprints or FingerprintIndex()
+            vectorstore = None
+            bm25_index = BM25Index()
+            fingerprints = FingerprintIndex(base_fingerprints.threshold)
+            chunk_count = len(base_bm25) if base_bm25 else 0
+            new_chunks = 0
+            duplicates = 0
+            embed_seconds = 0.0
+
+            for batch in iter_batches(documents, batch_size):
+                unique = []
+                for doc in batch:
+                    signature = minhash(doc.page_content)
+                    if (base_fingerprints.find_near_duplicate(signature) is not None
+                            or fingerprints.find_near_duplicate(signature) is not None):
+                        duplicates += 1
+                        continue
+                    fingerprints.add(signature)
+                    # Tag chunks so dense and lexical hits can be matched during fusion
+                    doc.metadata[CHUNK_ID_KEY] = chunk_count
+                    chunk_count += 1
+                    unique.append(doc)
+                progress("chunked", chunks=new_chunks + len(unique), duplicates=duplicates)
+                if not unique:
+                    continue
+                batch = unique
+                new_chunks += len(batch)
+
+                embed_start = time.perf_counter()
+                if vectorstore is None:
+                    vectorstore = FAISS.from_documents(batch, self.embedding_model)
+                else:
+                    vectorstore.add_documents(batch)
+                embed_seconds += time.perf_counter() - embed_start
+                bm25_index.add_documents(batch)
+                progress("embedded", embedded=new_chunks)
+
+            if vectorstore is None:
+                if base_vectorstore is None:
+                    raise ValueError("No content to index")
+                logger.info(f"Nothing new to index into profile '{profile_name}'")
+            else:
+                # Last chance to abort before anything becomes visible; nothing below may raise for it
+                progress("embedded", embedded=new_chunks)
+                if base_vectorstore is not None:
+                    # Searches of the warm index wait only for the merge, not for the save
+                    with self.profiles.index_lock(profile_name).writing():
+                        base_vectorstore.merge_from(vectorstore)
+                        if base_bm25 is not None:
+                            base_bm25.merge_from(bm25_index)
+                    base_fingerprints.merge_from(fingerprints)
+                    vectorstore = base_vectorstore
+                    bm25_index = base_bm25 if base_bm25 is not None else bm25_index
+                    fingerprints = base_fingerprints
+                self.profiles.save_index(profile_name, vectorstore, bm25_index, fingerprints)
+                # Sessions on this profile, including this one, see the new chunks on their next query
+
+        # Estimate what embedding the dropped duplicates would have cost
+        seconds_per_chunk = embed_seconds / new_chunks if new_chunks else 0.0
+        stats = {
+            "chunks": new_chunks,
+            "total_chunks": chunk_count,
+            "duplicates_dropped": duplicates,
+            "embed_seconds": embed_seconds,
+            "embed_seconds_saved": duplicates * seconds_per_chunk,
+            "total_seconds": time.perf_counter() - start_time
+        }
+        logger.info(
+            f"Indexed {new_chunks} new chunks ({chunk_count} total) in {stats['total_seconds']:.2f}s; "
+            f"dropped {duplicates} near-duplicates, saving ~{stats['embed_seconds_saved']:.2f}s of embedding"
+        )
+        return stats
+
+    def ingest_text(
+        self,
+        text: str,
+        file_format: str = "txt",
+        source: str = "",
+        append: bool = False,
+        progress: Optional[Callable[..., None]] = None,
+        profile_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Chunk and index extracted text into the given profile, by default the active one"""
+        from langchain_core.documents import Document
+
+        chunker = TokenChunker()
+        documents = (
+            Document(page_content=chunk, metadata={"source": source})
+            for chunk in chunker.chunk_lines(text.splitlines(), file_format)
+        )
+        return self.ingest_documents(documents, append=append, progress=progress, profile_name=profile_name)
+
+    def create_vectorstore(self, file_path: str, file_format: str = "txt", append: bool = False) -> Dict[str, Any]:
+        """Create vector store from document, or add the document to the current one"""
+        try:
+            from langchain_core.documents import Document
+
+            chunker = TokenChunker()
+            with open(file_path, "r", encoding="utf-8") as f:
+                documents = (
+                    Document(page_content=chunk, metadata={"source": file_path})
+                    for chunk in chunker.chunk_lines(f, file_format)
+                )
+                return self.ingest_documents(documents, append=append)
+
         except Exception as e:
             logger.error(f"Failed to create vector store: {str(e)}")
             raise e
-    
-    
\ No newline at end of file
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 3,
+        fetch_k: int = 10,
+        max_distance: float = MAX_DENSE_DISTANCE,
+        min_bm25_idf_fraction: float = MIN_BM25_IDF_FRACTION
+    ) -> List[Tuple[Any, float]]:
+        """
+        Retrieve chunks by fusing dense FAISS and BM25 rankings
+
+        Weak hits are dropped by each retriever's own score before fusion,
+        so a chunk found by only one retriever (e.g. an exact keyword match)
+        survives as long as that retriever is confident about it.
+        """
+        # Appends merge into the shared index in place, so do not search while one does
+        with self.profiles.index_lock(self.profile_name).reading():
+            vectorstore, bm25_index, _ = self._profile_index()
+            if not vectorstore:
+                return []
+
+            dense_hits = vectorstore.similarity_search_with_score(query, k=fetch_k)
+            ranked_lists = [[doc for doc, distance in dense_hits if distance <= max_distance]]
+
+            if bm25_index:
+                bm25_hits = bm25_index.search(query, k=fetch_k, min_idf_fraction=min_bm25_idf_fraction)
+                ranked_lists.append([doc for doc, score in bm25_hits])
+
+        return reciprocal_rank_fusion(ranked_lists, k=k)
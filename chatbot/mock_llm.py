@@ -0,0 +1,20 @@
+import re
+import time
+from types import SimpleNamespace
+
+
+class MockLLM:
+    """Offline stand-in for the chat model that echoes the user query, for local testing"""
+
+    QUERY_PATTERN = re.compile(r"USER QUERY: (.*)")
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, prompt: str):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        match = self.QUERY_PATTERN.search(str(prompt))
+        return SimpleNamespace(content=f"[mock] {match.group(1) if match else str(prompt)[-200:]}")
@@ -1,75 +1,82 @@
-import streamlit as st
-import pdfplumber
-import requests
-from bs4 import BeautifulSoup
+import io
 import logging
-from typing import Dict, Optional
+from typing import Any, Dict
 from .manager import ChatbotManager
-import urllib3
+from .csv_ingest import iter_csv_documents
 from urllib.parse import urlparse
 import re
-import bleach
-import os
 import hashlib
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Constants
-TEMP_TEXT_FILE = "temp_text.txt"
+CODE_EXTENSIONS = ["py", "java", "cpp", "js"]  # Add more extensions as needed
 
-def process_uploaded_file(file, chatbot_manager: ChatbotManager) -> Optional[Dict[str, str]]:
-    """Process uploaded file and extract character details"""
-    if file is None:
-        return None
-        
-    try:
-        file_extension = file.name.split(".")[-1].lower()
-        logger.info(file_extension+" file uploaded")
-        
-        if file_extension == "txt":
-            file_contents = file.read().decode("utf-8")
-            file_contents = "\n".join(line for line in file_contents.splitlines() if line.strip())
-
-        elif file_extension == "pdf":
-            with pdfplumber.open(file) as pdf:
-                file_contents = "\n".join(
-                    page.extract_text() for page in pdf.pages 
-                    if page.extract_text() and page.extract_text().strip()
-                )
-
-        elif file_extension in ["py", "java", "cpp", "js"]:  # Add more extensions as needed
-            file_contents = file.read().decode("utf-8")
-            file_contents = "\n".join(line for line in file_contents.splitlines() if line.strip())
-
-
-        elif file_extension == "csv":
-            import csv
-            reader = csv.reader(file)
-            file_contents = "\n".join(
-                ",".join(row) for row in reader 
-                if any(field.strip() for field in row)
+
+def extract_file_text(data: bytes, file_extension: str) -> str:
+    """
+    Extract indexable text from an uploaded file's contents
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    if file_extension == "txt" or file_extension in CODE_EXTENSIONS:
+        # Blank lines are kept: the chunker uses them as paragraph and block boundaries
+        return data.decode("utf-8")
+
+    if file_extension == "pdf":
+        import pdfplumber
+
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            return "\n".join(
+                page.extract_text() for page in pdf.pages
+                if page.extract_text() and page.extract_text().strip()
             )
-            
-        else:
-            st.error(f"Unsupported file type: {file_extension}")
-            return None
-            
-        # Save processed text to temporary file
-        with open(TEMP_TEXT_FILE, "w", encoding="utf-8") as f:
-            f.write(file_contents)
-            
-        # Create vector store and analyze content
-        chatbot_manager.create_vectorstore(TEMP_TEXT_FILE)
-        # return chatbot_manager.analyze_content()
-        return
-        
-    except Exception as e:
-        logger.error(f"Error processing file: {str(e)}")
-        st.error(f"Error processing file: {str(e)}")
-        return None
+
+    raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def ingest_upload(job, chatbot_manager: ChatbotManager, profile_name: str, file_name: str, data: bytes) -> Dict[str, Any]:
+    """Background job indexing an uploaded file into the given profile"""
+    file_extension = file_name.split(".")[-1].lower()
+    logger.info(file_extension+" file uploaded")
+
+    if file_extension == "csv":
+        # Stream rows straight into the index; extraction and chunking overlap
+        csv_stats = {}
+        job.report("extracted", bytes=len(data))
+        start_time = time.perf_counter()
+        index_stats = chatbot_manager.ingest_documents(
+            iter_csv_documents(io.BytesIO(data), source=file_name, stats=csv_stats),
+            append=True,
+            progress=job.report,
+            profile_name=profile_name
+        )
+        elapsed = time.perf_counter() - start_time
+        rows_per_second = csv_stats["rows"] / elapsed if elapsed else 0.0
+        logger.info(
+            f"Ingested {csv_stats['rows']} CSV rows into {csv_stats['documents']} documents "
+            f"in {elapsed:.2f}s ({rows_per_second:.0f} rows/s)"
+        )
+        return dict(index_stats, rows=csv_stats["rows"], rows_per_second=rows_per_second)
+
+    file_contents = extract_file_text(data, file_extension)
+    job.report("extracted", characters=len(file_contents))
+    return chatbot_manager.ingest_text(
+        file_contents, file_format=file_extension, source=file_name, append=True,
+        progress=job.report, profile_name=profile_name
+    )
+
+
+def ingest_webpage(job, chatbot_manager: ChatbotManager, profile_name: str, url: str) -> Dict[str, Any]:
+    """Background job indexing a webpage into the given profile"""
+    text = fetch_webpage_text(url)
+    job.report("extracted", characters=len(text))
+    return chatbot_manager.ingest_text(
+        text, source=url, append=True, progress=job.report, profile_name=profile_name
+    )
 
 
 class WebPageSecurityManager:
@@ -178,6 +185,8 @@ class WebPageSecurityManager:
         sanitized_text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
         
         # Remove potential XSS and script injection attempts
+        import bleach
+
         sanitized_text = bleach.clean(sanitized_text, tags=[], attributes={}, protocols=[], strip=True)
         sanitized_text = re.sub(r'javascript:', '', sanitized_text, flags=re.IGNORECASE)
         
@@ -197,133 +206,103 @@ class WebPageSecurityManager:
         """
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-def fetch_webpage_content(
-    url: str, 
-    chatbot_manager, 
+def fetch_webpage_text(
+    url: str,
     max_content_size: int = 10 * 1024 * 1024,  # 10 MB default limit
     strict_domain_check: bool = True
-) -> Optional[Dict[str, str]]:
+) -> str:
     """
-    Advanced secure webpage content fetching
-    
+    Advanced secure webpage text fetching
+
     Args:
         url (str): URL of the webpage to fetch
-        chatbot_manager: Chatbot management object
         max_content_size (int): Maximum allowed content size
         strict_domain_check (bool): Whether to enforce strict domain validation
-    
+
     Returns:
-        Optional[Dict[str, str]]: Processed webpage content or None
+        str: Sanitized text of the webpage
+
+    Raises:
+        ValueError: If the URL is unsafe or the response is unusable
+        requests.exceptions.RequestException: If the fetch fails
     """
+    # Heavy HTTP/HTML dependencies are only needed once a page is fetched
+    import requests
+    import urllib3
+    from bs4 import BeautifulSoup
+
     # Validate URL safety
     if not WebPageSecurityManager.is_safe_url(url, strict=strict_domain_check):
-        st.error("Invalid or potentially malicious URL")
         logging.warning(f"Blocked potentially unsafe URL: {url}")
-        return None
-    
-    try:
-        # Disable insecure request warnings
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        
-        # Enhanced security headers with randomization
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Referer": "https://www.google.com"  # Add a plausible referer
-        }
-        
-        # Rate limiting simulation
-        time.sleep(1)  # Basic rate limiting
-        
-        # Secure request with advanced parameters
-        with requests.Session() as session:
-            # Use session for potential connection pooling and cookie management
-            response = session.get(
-                url, 
-                headers=headers, 
-                timeout=(5, 10),  # Connect timeout, read timeout
-                verify=True,  # Enforce SSL certificate verification
-                stream=True,
-                allow_redirects=False  # Prevent unintended redirects
-            )
-            
-            # Advanced response validation
-            if response.status_code != 200:
-                st.error(f"Webpage fetch failed: HTTP {response.status_code}")
-                logging.warning(f"Unexpected status code for {url}: {response.status_code}")
-                return None
-            
-            # Check content length
-            content_length = int(response.headers.get('content-length', 0))
-            if content_length > max_content_size:
-                st.error(f"Content size exceeds {max_content_size/1024/1024} MB")
-                return None
-            
-            # Read and limit response
-            response.raw.decode_content = True
-            response_text = response.text[:max_content_size]
-            
-            # Content hash for duplicate detection
-            content_signature = WebPageSecurityManager.content_hash(response_text)
-            logging.info(f"Content hash for {url}: {content_signature}")
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(response_text, "html.parser")
-        
-        # Remove potentially dangerous elements
-        for element in soup(["script", "style", "iframe", "object", "embed", "form"]):
-            element.decompose()
-        
-        # Extract text from safe elements
-        text_elements = soup.find_all([
-            "p", "h1", "h2", "h3", "h4", 
-            "article", "section", 
-            "div.content", "main", "body"
-        ])
-        
-        # Combine and sanitize text
-        text = "\n\n".join([
-            WebPageSecurityManager.sanitize_text(elem.get_text(strip=True)) 
-            for elem in text_elements 
-            if elem.get_text(strip=True)
-        ])
-        
-        # Secure temporary file handling
-        import tempfile
-        with tempfile.NamedTemporaryFile(
-            mode='w', 
-            delete=False, 
-            encoding='utf-8', 
-            suffix='.txt'
-        ) as temp_file:
-            temp_file.write(text)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Process content
-            chatbot_manager.create_vectorstore(temp_file_path)
-            # result = chatbot_manager.analyze_content()
-            return 
-        
-        finally:
-            # Always clean up the temporary file
-            try:
-                os.unlink(temp_file_path)
-            except Exception as cleanup_error:
-                logging.error(f"Error cleaning up temp file: {cleanup_error}")
-    
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Secure fetch error: {str(e)}")
-        st.error(f"Secure fetch error: {str(e)}")
-        return None
-    except Exception as e:
-        logging.error(f"Unexpected error in webpage fetching: {str(e)}")
-        st.error(f"Unexpected error: {str(e)}")
-        return None
+        raise ValueError("Invalid or potentially malicious URL")
+
+    # Disable insecure request warnings
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    # Enhanced security headers with randomization
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "DNT": "1",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Referer": "https://www.google.com"  # Add a plausible referer
+    }
+
+    # Rate limiting simulation
+    time.sleep(1)  # Basic rate limiting
+
+    # Secure request with advanced parameters
+    with requests.Session() as session:
+        # Use session for potential connection pooling and cookie management
+        response = session.get(
+            url,
+            headers=headers,
+            timeout=(5, 10),  # Connect timeout, read timeout
+            verify=True,  # Enforce SSL certificate verification
+            stream=True,
+            allow_redirects=False  # Prevent unintended redirects
+        )
+
+        # Advanced response validation
+        if response.status_code != 200:
+            logging.warning(f"Unexpected status code for {url}: {response.status_code}")
+            raise ValueError(f"Webpage fetch failed: HTTP {response.status_code}")
+
+        # Check content length
+        content_length = int(response.headers.get('content-length', 0))
+        if content_length > max_content_size:
+            raise ValueError(f"Content size exceeds {max_content_size/1024/1024} MB")
+
+        # Read and limit response
+        response.raw.decode_content = True
+        response_text = response.text[:max_content_size]
+
+        # Content hash for duplicate detection
+        content_signature = WebPageSecurityManager.content_hash(response_text)
+        logging.info(f"Content hash for {url}: {content_signature}")
+
+    # Parse with BeautifulSoup
+    soup = BeautifulSoup(response_text, "html.parser")
+
+    # Remove potentially dangerous elements
+    for element in soup(["script", "style", "iframe", "object", "embed", "form"]):
+        element.decompose()
+
+    # Extract text from safe elements
+    text_elements = soup.find_all([
+        "p", "h1", "h2", "h3", "h4",
+        "article", "section",
+        "div.content", "main", "body"
+    ])
+
+    # Combine and sanitize text
+    return "\n\n".join([
+        WebPageSecurityManager.sanitize_text(elem.get_text(strip=True))
+        for elem in text_elements
+        if elem.get_text(strip=True)
+    ])
 
 # Additional security configuration
 logging.basicConfig(
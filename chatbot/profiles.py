@@ -0,0 +1,228 @@
+import os
+import re
+import json
+import pickle
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .utils import load_embedding_model
+from .dedup import FingerprintIndex
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+PROFILES_DIR = "profiles"
+DEFAULT_PROFILE = "default"
+MAX_WARM_PROFILES = 3
+PROFILE_NAME_PATTERN = re.compile(r"^[\w][\w -]{0,63}$")
+
+CONFIG_FILENAME = "config.json"
+INDEX_DIRNAME = "index"
+BM25_FILENAME = "bm25.pkl"
+FINGERPRINTS_FILENAME = "fingerprints.json"
+
+
+class ReadWriteLock:
+    """Lock shared by any number of readers or held by one writer; waiting writers go first"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class ProfileStore:
+    """
+    On-disk store of character profiles, each with its own config and persisted index
+
+    Layout: <directory>/<profile>/config.json, <profile>/index/ (FAISS),
+    <profile>/bm25.pkl and <profile>/fingerprints.json (dedup). Loaded
+    indexes of the most recently used profiles are kept in memory (up to
+    max_warm); others are loaded from disk on demand. Sessions look their
+    index up here on every use instead of holding on to it, so an evicted
+    index is actually freed. Appends are merged into the warm index in
+    place, so searches hold index_lock(name).reading() and merges hold
+    .writing().
+    """
+
+    def __init__(
+        self,
+        directory: str = PROFILES_DIR,
+        max_warm: int = MAX_WARM_PROFILES,
+        embedding_loader: Callable[[], Any] = load_embedding_model
+    ):
+        self.directory = directory
+        self.max_warm = max_warm
+        self.embedding_loader = embedding_loader
+        self._warm: "OrderedDict[str, Tuple[Any, Any, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._ingest_locks: Dict[str, threading.Lock] = {}
+        self._index_locks: Dict[str, ReadWriteLock] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str, *parts: str) -> str:
+        if not PROFILE_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        return os.path.join(self.directory, name, *parts)
+
+    def list_profiles(self) -> List[str]:
+        """Names of all stored profiles"""
+        return sorted(
+            entry for entry in os.listdir(self.directory)
+            if os.path.isfile(os.path.join(self.directory, entry, CONFIG_FILENAME))
+        )
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self._path(name, CONFIG_FILENAME))
+
+    def load_config(self, name: str) -> Dict[str, Any]:
+        """Load a profile's configuration"""
+        with open(self._path(name, CONFIG_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_config(self, name: str, config: Dict[str, Any]) -> None:
+        """Create or overwrite a profile's configuration"""
+        os.makedirs(self._path(name), exist_ok=True)
+        with open(self._path(name, CONFIG_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+
+    def ingest_lock(self, name: str) -> threading.Lock:
+        """Lock serializing index updates of one profile"""
+        with self._lock:
+            return self._ingest_locks.setdefault(name, threading.Lock())
+
+    def index_lock(self, name: str) -> ReadWriteLock:
+        """Lock between searches of a profile's warm index and in-place merges into it"""
+        with self._lock:
+            return self._index_locks.setdefault(name, ReadWriteLock())
+
+    def _remember(self, name: str, index: Tuple[Any, Any, Any]) -> None:
+        """Mark an index as most recently used, evicting the least recently used beyond the budget"""
+        self._warm[name] = index
+        self._warm.move_to_end(name)
+        while len(self._warm) > self.max_warm:
+            evicted, _ = self._warm.popitem(last=False)
+            logger.info(f"Evicted index of profile '{evicted}' from memory")
+
+    def get_index(self, name: str) -> Tuple[Optional[Any], Optional[Any], Optional[FingerprintIndex]]:
+        """Return (vectorstore, bm25_index, fingerprints) for a profile, all None if it has no index"""
+        with self._lock:
+            if name in self._warm:
+                self._warm.move_to_end(name)
+                return self._warm[name]
+
+            index_path = self._path(name, INDEX_DIRNAME)
+            old_path = index_path + ".old"
+            if not os.path.isdir(index_path) and os.path.isdir(old_path):
+                # Interrupted in the middle of swapping in a new index
+                os.replace(old_path, index_path)
+            if not os.path.isdir(index_path):
+                return None, None, None
+
+            from langchain.vectorstores import FAISS
+
+            # The index was written by this application, so its pickled docstore is trusted
+            vectorstore = FAISS.load_local(index_path, self.embedding_loader(), allow_dangerous_deserialization=True)
+            bm25_index = None
+            bm25_path = self._path(name, BM25_FILENAME)
+            if os.path.exists(bm25_path):
+                with open(bm25_path, "rb") as f:
+                    bm25_index = pickle.load(f)
+
+            fingerprints = None
+            fingerprints_path = self._path(name, FINGERPRINTS_FILENAME)
+            if os.path.exists(fingerprints_path):
+                try:
+                    fingerprints = FingerprintIndex.load(fingerprints_path)
+                except ValueError as e:
+                    logger.warning(f"Rebuilding fingerprints of profile '{name}': {str(e)}")
+            if fingerprints is None:
+                # Index saved before dedup (or in an older format): fingerprint what it already holds
+                fingerprints = FingerprintIndex.from_texts(
+                    doc.page_content for doc in (bm25_index.documents if bm25_index else [])
+                )
+
+            logger.info(f"Loaded index of profile '{name}' from disk")
+            self._remember(name, (vectorstore, bm25_index, fingerprints))
+            return vectorstore, bm25_index, fingerprints
+
+    def save_index(
+        self,
+        name: str,
+        vectorstore: Any,
+        bm25_index: Any = None,
+        fingerprints: Optional[FingerprintIndex] = None
+    ) -> None:
+        """Persist a profile's index and keep it warm"""
+        with self._lock:
+            os.makedirs(self._path(name), exist_ok=True)
+            self._save_vectorstore(name, vectorstore)
+            if bm25_index is not None:
+                temp_path = self._path(name, BM25_FILENAME + ".tmp")
+                with open(temp_path, "wb") as f:
+                    pickle.dump(bm25_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self._path(name, BM25_FILENAME))
+            if fingerprints is not None:
+                temp_path = self._path(name, FINGERPRINTS_FILENAME + ".tmp")
+                fingerprints.save(temp_path)
+                os.replace(temp_path, self._path(name, FINGERPRINTS_FILENAME))
+            self._remember(name, (vectorstore, bm25_index, fingerprints))
+
+    def _save_vectorstore(self, name: str, vectorstore: Any) -> None:
+        """Write the FAISS index to a temporary directory and swap it in, so a failed save keeps the old one"""
+        index_path = self._path(name, INDEX_DIRNAME)
+        temp_path = index_path + ".tmp"
+        old_path = index_path + ".old"
+        for path in (temp_path, old_path):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+        vectorstore.save_local(temp_path)
+        # Directories cannot be replaced in one rename; get_index restores ".old" if we stop in between
+        if os.path.isdir(index_path):
+            os.replace(index_path, old_path)
+        os.replace(temp_path, index_path)
+        if os.path.isdir(old_path):
+            shutil.rmtree(old_path)
+
+
+@lru_cache(maxsize=None)
+def get_profile_store(directory: str = PROFILES_DIR) -> ProfileStore:
+    """Process-wide profile store, so warm indexes are shared between sessions"""
+    return ProfileStore(directory)
@@ -0,0 +1,108 @@
+"""
+Startup profiling for the Streamlit app.
+
+Usage:
+    python -m chatbot.profiling [module] [--top N] [--depth N]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reports the self time of each imported module, checked against
+IMPORT_TARGET_MS. With --depth N, modules are summed per dotted prefix of N
+parts instead (e.g. --depth 1 gives one line per top-level package).
+Setting CHATBOT_PROFILE=1 while running the app additionally logs the time
+of each script run (time-to-first-render on a fresh session) against
+FIRST_RENDER_TARGET_MS.
+"""
+import argparse
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+IMPORT_TARGET_MS = 500
+FIRST_RENDER_TARGET_MS = 1000
+PROFILE_ENV_VAR = "CHATBOT_PROFILE"
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)")
+
+
+def _import_self_times(code: str) -> List[Tuple[str, float]]:
+    """Run code under -X importtime and return (module, self ms) for every module it imported"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.splitlines()[-1] if result.stderr else ""
+        raise RuntimeError(f"Running {code!r} failed: {last_line}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            times.append((match.group(3), int(match.group(1)) / 1000))
+    return times
+
+
+def profile_imports(module: str = "app", depth: Optional[int] = None) -> List[Tuple[str, float]]:
+    """
+    Import a module in a fresh interpreter and return (name, ms), most expensive first
+
+    Names are full module names, or their first `depth` dotted parts with
+    the self times of all modules sharing that prefix summed.
+    """
+    # Modules loaded by interpreter startup (site, encodings, ...) are not the app's cost
+    startup = {name for name, _ in _import_self_times("pass")}
+
+    costs: Dict[str, float] = defaultdict(float)
+    for name, ms in _import_self_times(f"import {module}"):
+        if name not in startup:
+            costs[".".join(name.split(".")[:depth])] += ms
+
+    return sorted(costs.items(), key=lambda item: item[1], reverse=True)
+
+
+def profiling_enabled() -> bool:
+    return os.getenv(PROFILE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def report_render_time(script_start: float) -> None:
+    """Log how long the current script run took when profiling is enabled"""
+    if not profiling_enabled():
+        return
+    elapsed_ms = (time.perf_counter() - script_start) * 1000
+    if elapsed_ms > FIRST_RENDER_TARGET_MS:
+        logger.warning(f"Render took {elapsed_ms:.0f} ms (target {FIRST_RENDER_TARGET_MS} ms)")
+    else:
+        logger.info(f"Render took {elapsed_ms:.0f} ms (target {FIRST_RENDER_TARGET_MS} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="app", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list")
+    parser.add_argument("--depth", type=int, default=None, help="Sum modules per dotted prefix of this many parts")
+    args = parser.parse_args()
+
+    costs = profile_imports(args.module, args.depth)
+    total = sum(ms for _, ms in costs)
+
+    print(f"{'module':<48} {'ms':>14}")
+    for name, ms in costs[:args.top]:
+        print(f"{name:<48} {ms:14.1f}")
+    print(f"\nTotal import time of {args.module}: {total:.1f} ms (target {IMPORT_TARGET_MS} ms)")
+
+    sys.exit(0 if total <= IMPORT_TARGET_MS else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,30 @@
 import re
 import logging
+from functools import lru_cache
 from typing import Dict, List, Any
-from transformers import pipeline
-import streamlit as st
-from tiktoken import encoding_for_model 
-from langchain.prompts import ChatPromptTemplate
+from .context import compress_context
+from .gateway import get_gateway
+from .utils import get_encoding
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Constants
+MAX_HISTORY_MESSAGES = 50  # Recent turns read from the conversation store before the token cap applies
+
+
+class LLMUnavailableError(RuntimeError):
+    """No language model is configured"""
+
+
+class LLMRequestError(RuntimeError):
+    """The language model failed to answer"""
+
 
 def count_tokens(text: str, model_name="gpt-3.5-turbo") -> int:
     """Estimate the number of tokens in a given text."""
-    enc = encoding_for_model(model_name)
-    return len(enc.encode(text))
+    return len(get_encoding(model_name).encode(text))
 
 def log_token_usage(input_tokens: int, output_tokens: int):
     """Log token usage to a file."""
@@ -34,9 +44,20 @@ def format_chat_history(messages: List[Dict[str, str]]) -> str:
     return formatted_history.strip()
 
 
-def create_character_prompt(config: dict, user_input: str, chat_history: str = "") -> ChatPromptTemplate:
-    """Create a structured ChatPromptTemplate for character-based responses with chat history as a separate message."""
-    
+@lru_cache(maxsize=32)
+def compile_character_prompt(
+    name: str,
+    role: str,
+    personality: str,
+    appearance: str,
+    interests: str,
+    abilities: str,
+    additional_info: str,
+    with_history: bool
+):
+    """Build the ChatPromptTemplate for a character once; cached so switching between profiles reuses it"""
+    from langchain_core.prompts import ChatPromptTemplate
+
     # System message with placeholders for character details
     system_message = """
     You are {name}, a {role}.
@@ -58,44 +79,81 @@ def create_character_prompt(config: dict, user_input: str, chat_history: str = "
     """
 
     # Format additional_info properly (optional field)
-    additional_info = f"- Additional info: {config.get('additional_info', '')}" if config.get('additional_info') else ""
+    additional_info = f"- Additional info: {additional_info}" if additional_info else ""
 
     # Construct the final ChatPromptTemplate
     prompt_messages = [
         ("system", system_message.format(
-            name=config["name"],
-            role=config["role"],
-            personality=config["personality"],
-            appearance=config["appearance"],
-            interests=config["interests"],
-            abilities=config["abilities"],
+            name=name,
+            role=role,
+            personality=personality,
+            appearance=appearance,
+            interests=interests,
+            abilities=abilities,
             additional_info=additional_info
         )),
     ]
 
     # Add chat history if available
-    if chat_history:
+    if with_history:
         prompt_messages.append(("user", "CHAT HISTORY:\n{chat_history}"))
 
     # Add user query separately
     prompt_messages.append(("user", "USER QUERY: {user_input}"))
 
     # Create prompt template
-    prompt = ChatPromptTemplate.from_messages(prompt_messages)
+    return ChatPromptTemplate.from_messages(prompt_messages)
+
+
+def create_character_prompt(config: dict, user_input: str, chat_history: str = "") -> str:
+    """Create a structured ChatPromptTemplate for character-based responses with chat history as a separate message."""
+    prompt = compile_character_prompt(
+        config["name"],
+        config["role"],
+        config["personality"],
+        config["appearance"],
+        config["interests"],
+        config["abilities"],
+        config.get("additional_info", ""),
+        bool(chat_history)
+    )
 
     return prompt.format(chat_history=chat_history, user_input=user_input)
 
 
+def generate_response(
+    user_input: str,
+    chatbot_manager,
+    messages: List[Dict[str, str]],
+    conversation_store=None,
+    raise_errors: bool = False
+) -> str:
+    """
+    Generate response based on user input, character configuration, and chat history
+
+    By default failures are answered with an apology fit for the chat UI;
+    with raise_errors=True they raise LLMUnavailableError, LLMRequestError
+    or the original exception instead, so callers can report them.
+    """
+
+    # Fixed history budget: rolling summary of older turns + verbatim recent turns
+    MAX_HISTORY_TOKENS = 1000
+    summary = ""
+    recent_messages = messages[:-1]
 
-def generate_response(user_input: str, chatbot_manager, messages: List[Dict[str, str]]) -> str:
-    """Generate response based on user input, character configuration, and chat history"""
+    if conversation_store is not None:
+        # Other tabs may append to or clear the same conversation, so read the
+        # turns after the summary from the store rather than this session's cache
+        summary, covered = chatbot_manager.summarizer.get(conversation_store.conversation_id, conversation_store)
+        total = len(conversation_store)
+        recent_messages = conversation_store.read(max(covered, total - MAX_HISTORY_MESSAGES), total)
+        if recent_messages and recent_messages[-1] == {"role": "user", "content": user_input}:
+            recent_messages = recent_messages[:-1]
 
-    # Limit chat history tokens
-    MAX_HISTORY_TOKENS = 1500  
     previous_messages = []
     token_count = 0
 
-    for msg in reversed(messages[:-1]):  
+    for msg in reversed(recent_messages):
         tokens = count_tokens(msg["content"])
         if token_count + tokens > MAX_HISTORY_TOKENS:
             break
@@ -103,9 +161,13 @@ def generate_response(user_input: str, chatbot_manager, messages: List[Dict[str,
         token_count += tokens
 
     chat_history = format_chat_history(previous_messages)
+    if summary:
+        chat_history = f"SUMMARY OF EARLIER CONVERSATION:\n{summary}\n\nRECENT MESSAGES:\n{chat_history}"
 
     try:
         if not chatbot_manager.llm:
+            if raise_errors:
+                raise LLMUnavailableError("LLM is not available")
             return "I'm having trouble connecting to my language model. Please try again later."
 
         # 🔹 Create the full prompt for the LLM
@@ -115,34 +177,45 @@ def generate_response(user_input: str, chatbot_manager, messages: List[Dict[str,
         input_tokens = count_tokens(character_details)
 
         retrieved_text = ""
+        raw_retrieved_token_count = 0
         retrieved_token_count = 0
 
-        if chatbot_manager.vectorstore and chatbot_manager.qa_chain:
-            # 🔹 Retrieve context **using only the user query**
-            retrieved_docs_with_scores = chatbot_manager.vectorstore.similarity_search_with_score(user_input, k=5)
-
-            # Extract text and similarity scores
-            retrieved_texts = []
-            for doc, score in retrieved_docs_with_scores:
-                retrieved_texts.append(f"[Score: {score:.2f}] {doc.page_content}")
-
-            retrieved_text = "\n\n".join(retrieved_texts)
+        if chatbot_manager.vectorstore:
+            # 🔹 Retrieve context **using only the user query** (dense + BM25 fusion)
+            retrieved_docs_with_scores = chatbot_manager.hybrid_search(user_input, k=3)
+            raw_retrieved_token_count = count_tokens(
+                "\n\n".join(doc.page_content for doc, _ in retrieved_docs_with_scores)
+            )
+
+            # 🔹 Drop low-score, duplicate and overlapping text before prompting
+            compressed = compress_context(
+                retrieved_docs_with_scores,
+                user_input,
+                extract_sentences=chatbot_manager.config.get("extract_relevant_sentences", False)
+            )
+            retrieved_text = "\n\n".join(text for text, _ in compressed)
 
             # 🔹 Count tokens in retrieved text
             retrieved_token_count = count_tokens(retrieved_text)
-            logger.info(f"Retrieved context tokens: {retrieved_token_count}")
-            logger.info(f"Retrieved Text with Scores:\n{retrieved_text}")
+            logger.info(f"Retrieved context tokens: {raw_retrieved_token_count} -> {retrieved_token_count}")
+            logger.info("Retrieved Text with Scores:\n" + "\n\n".join(
+                f"[Score: {score:.2f}] {text}" for text, score in compressed
+            ))
 
         # 🔹 Pass full prompt + retrieved context to the LLM
         final_prompt = f"{character_details}\n\nRetrieved Context:\n{retrieved_text}"
-        response = chatbot_manager.llm.invoke(final_prompt).content
+        try:
+            response = get_gateway().invoke(chatbot_manager.llm, final_prompt).content
+        except Exception as e:
+            raise LLMRequestError(str(e)) from e
 
         # 🔹 Count output tokens
         full_output_tokens = count_tokens(response)
 
         # 🔹 Log token usage
         log_entry = (
-            f"Input Tokens: {input_tokens}, Retrieved Tokens: {retrieved_token_count}, "
+            f"Input Tokens: {input_tokens}, Raw Retrieved Tokens: {raw_retrieved_token_count}, "
+            f"Retrieved Tokens: {retrieved_token_count}, "
             f"Full Output Tokens: {full_output_tokens}, Total Tokens: {input_tokens + retrieved_token_count + full_output_tokens}\n"
         )
         with open("token_log.txt", "a") as log_file:
@@ -156,4 +229,6 @@ def generate_response(user_input: str, chatbot_manager, messages: List[Dict[str,
 
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}")
+        if raise_errors:
+            raise
         return "I'm having trouble responding right now. Please try again."
\ No newline at end of file
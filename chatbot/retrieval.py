@@ -0,0 +1,138 @@
+import math
+import re
+import heapq
+import logging
+from collections import defaultdict
+from typing import Dict, List, Tuple, Iterable, Any
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+CHUNK_ID_KEY = "chunk_id"
+RRF_K = 60
+# Per-retriever relevance floors, applied before fusion
+MAX_DENSE_DISTANCE = 1.4  # Squared L2 between unit embeddings, i.e. cosine similarity >= 0.3
+# BM25 scores grow with log(corpus size), so the floor is a fraction of the IDF of a
+# term found in a single chunk: one rare matching term passes on a 3-chunk index and
+# on a 100k-chunk one, while a term present in most chunks does not
+MIN_BM25_IDF_FRACTION = 0.5
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+CAMEL_CASE_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, also indexing the parts of snake_case and camelCase identifiers"""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text):
+        terms.append(token.lower())
+        parts = [part for piece in token.split("_") for part in CAMEL_CASE_PATTERN.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(part.lower() for part in parts)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 inverted index over document chunks"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.doc_lengths: List[int] = []
+        self.documents: List[Any] = []
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_documents(self, documents: Iterable[Any]) -> None:
+        """Index documents, keyed by their position in the index"""
+        for doc in documents:
+            doc_id = len(self.documents)
+            terms = tokenize(doc.page_content)
+            for term in terms:
+                postings = self.postings[term]
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+            self.documents.append(doc)
+            self.doc_lengths.append(len(terms))
+            self.total_length += len(terms)
+
+    def merge_from(self, other: "BM25Index") -> None:
+        """Append another index's documents, in time proportional to the other index"""
+        offset = len(self.documents)
+        for term, postings in other.postings.items():
+            merged = self.postings[term]
+            for doc_id, tf in postings.items():
+                merged[doc_id + offset] = tf
+        self.documents.extend(other.documents)
+        self.doc_lengths.extend(other.doc_lengths)
+        self.total_length += other.total_length
+
+    def _idf(self, doc_frequency: int) -> float:
+        return math.log(1 + (len(self.documents) - doc_frequency + 0.5) / (doc_frequency + 0.5))
+
+    def max_idf(self) -> float:
+        """IDF of a term that occurs in a single document, the largest any term can have"""
+        return self._idf(1) if self.documents else 0.0
+
+    def search(self, query: str, k: int = 5, min_idf_fraction: float = 0.0) -> List[Tuple[Any, float]]:
+        """
+        Return the top k documents for the query with their BM25 scores
+
+        Documents scoring below min_idf_fraction * max_idf() are left out.
+        """
+        if not self.documents:
+            return []
+
+        doc_count = len(self.documents)
+        avg_length = self.total_length / doc_count or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(len(postings))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        min_score = min_idf_fraction * self.max_idf()
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.documents[doc_id], score) for doc_id, score in top if score >= min_score]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[List[Any]],
+    k: int = 5,
+    weights: List[float] = None,
+    rrf_k: int = RRF_K
+) -> List[Tuple[Any, float]]:
+    """
+    Fuse several ranked document lists with reciprocal rank fusion
+
+    Args:
+        ranked_lists (List[List[Any]]): Documents ordered best first, one list per retriever
+        k (int): Number of fused results to return
+        weights (List[float]): Optional weight per retriever
+        rrf_k (int): Rank smoothing constant
+
+    Returns:
+        List[Tuple[Any, float]]: Documents with fused scores normalized to [0, 1]
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    fused: Dict[Any, float] = defaultdict(float)
+    docs: Dict[Any, Any] = {}
+
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, doc in enumerate(ranked):
+            key = doc.metadata.get(CHUNK_ID_KEY, doc.page_content)
+            fused[key] += weight / (rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+
+    # A document ranked first by every retriever scores 1.0
+    best_possible = sum(weights) / (rrf_k + 1)
+    top = heapq.nlargest(k, fused.items(), key=lambda item: item[1])
+    return [(docs[key], score / best_possible) for key, score in top]
@@ -0,0 +1,204 @@
+"""
+Headless HTTP API around ChatbotManager.
+
+Usage:
+    python -m chatbot.server [--host 127.0.0.1] [--port 8000] [--workers 4] [--queue-size 32] [--mock-llm]
+
+Endpoints:
+    GET  /health  -> {"status": "ok", "in_flight": ..., "capacity": ..., "llm": {gateway metrics}}
+    POST /query   {"question": "...", "history": [{"role": ..., "content": ...}]}
+                  -> {"answer": "...", "seconds": ...}
+
+Connections are kept alive (HTTP/1.1). Questions run on a fixed worker
+pool sharing one ChatbotManager; when workers plus queue are full the
+server answers 503 with Retry-After instead of queueing without bound.
+LLM failures are reported as 502 (upstream error), 503 (no LLM
+configured) or 504 (no answer within REQUEST_TIMEOUT seconds).
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .api import add_manager_arguments, answer, create_manager
+from .gateway import get_gateway
+from .response import LLMRequestError, LLMUnavailableError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_QUEUE_SIZE = 32
+REQUEST_TIMEOUT = 120
+IDLE_TIMEOUT = 30
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def _is_valid_history(history: Any) -> bool:
+    """Whether history is a list of {"role": str, "content": str} messages"""
+    return isinstance(history, list) and all(
+        isinstance(message, dict)
+        and isinstance(message.get("role"), str)
+        and isinstance(message.get("content"), str)
+        for message in history
+    )
+
+
+class QueryService:
+    """Bounded worker pool answering questions with a shared ChatbotManager"""
+
+    def __init__(self, manager, workers: int, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.manager = manager
+        self.capacity = workers + queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query-worker")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def submit(self, question: str, history=None):
+        """Queue a question; returns None when the service is at capacity"""
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(answer, self.manager, question, history)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = IDLE_TIMEOUT
+    service: QueryService = None
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s - %s" % (self.address_string(), format % args))
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": "Not found"})
+            return
+        self._send_json(200, {
+            "status": "ok",
+            "in_flight": self.service.in_flight,
+            "capacity": self.service.capacity,
+            "llm": get_gateway().metrics()
+        })
+
+    def do_POST(self) -> None:
+        if self.path != "/query":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413 if length > MAX_BODY_BYTES else 400, {"error": "Invalid request body size"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length))
+            question = payload["question"]
+            history = payload.get("history") or []
+            if not isinstance(question, str) or not question.strip() or not _is_valid_history(history):
+                raise ValueError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self._send_json(400, {
+                "error": "Expected JSON with a non-empty 'question' and optional 'history' list "
+                         "of {'role': str, 'content': str} objects"
+            })
+            return
+
+        start_time = time.perf_counter()
+        future = self.service.submit(question, history)
+        if future is None:
+            self._send_json(503, {"error": "Server busy"}, headers={"Retry-After": "1"})
+            return
+
+        try:
+            response = future.result(timeout=REQUEST_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.error(f"No answer within {REQUEST_TIMEOUT}s")
+            self._send_json(504, {"error": "Timed out waiting for the LLM"})
+            return
+        except LLMUnavailableError as e:
+            self._send_json(503, {"error": str(e)})
+            return
+        except LLMRequestError as e:
+            logger.error(f"LLM failed to answer: {str(e)}")
+            self._send_json(502, {"error": "LLM request failed"})
+            return
+        except Exception as e:
+            logger.error(f"Error answering question: {str(e)}")
+            self._send_json(500, {"error": "Failed to answer question"})
+            return
+
+        self._send_json(200, {"answer": response, "seconds": round(time.perf_counter() - start_time, 3)})
+
+
+def create_server(manager, host: str, port: int, workers: int, queue_size: int = DEFAULT_QUEUE_SIZE) -> ThreadingHTTPServer:
+    """Create (but do not start) the HTTP server"""
+    service = QueryService(manager, workers, queue_size)
+    handler = type("BoundQueryRequestHandler", (QueryRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Questions allowed to wait for a worker")
+    add_manager_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        manager = create_manager(args.profile, mock_llm=args.mock_llm, mock_latency=args.mock_latency)
+    except ValueError as e:
+        parser.error(str(e))
+    server = create_server(manager, args.host, args.port, args.workers, args.queue_size)
+    logger.info(f"Serving profile '{args.profile}' on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
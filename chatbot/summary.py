@@ -0,0 +1,161 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from .gateway import get_gateway
+from .utils import get_encoding
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+RECENT_MESSAGES = 6        # Messages always kept verbatim, never summarized
+SUMMARY_MAX_TOKENS = 400
+MAX_FOLD_MESSAGES = 20     # Messages folded per LLM call, bounding a catch-up after a reload
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a chatbot character.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW MESSAGES:
+{messages}
+
+Rewrite the summary so it also covers the new messages. Keep facts, names, decisions
+and open questions; drop small talk. Use at most {max_words} words. Reply with the summary only."""
+
+
+class ConversationSummarizer:
+    """
+    Folds older turns of each conversation into a rolling summary off the request path
+
+    The summary for a conversation is kept together with the number of
+    messages it covers, both cached in memory and persisted next to the
+    conversation log, so each refresh only sends the summary plus messages
+    added since the last one, also after a reload. Large backlogs are
+    folded in batches of at most `max_fold_messages`. Folding runs on a
+    single background thread; `llm` is anything with `invoke(prompt).content`.
+    """
+
+    def __init__(
+        self,
+        llm,
+        recent_messages: int = RECENT_MESSAGES,
+        max_summary_tokens: int = SUMMARY_MAX_TOKENS,
+        max_fold_messages: int = MAX_FOLD_MESSAGES
+    ):
+        self.llm = llm
+        self.recent_messages = recent_messages
+        self.max_summary_tokens = max_summary_tokens
+        self.max_fold_messages = max_fold_messages
+        self._summaries: Dict[str, Tuple[str, int]] = {}
+        self._epochs: Dict[str, int] = {}
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+
+    def _state(self, conversation_id: str, store=None) -> Tuple[str, int]:
+        """Cached (summary, covered), loaded from the store on first use; call with the lock held"""
+        if conversation_id not in self._summaries and store is not None:
+            self._summaries[conversation_id] = store.read_summary()
+        state = self._summaries.get(conversation_id, ("", 0))
+        if store is not None and state[1] > len(store):
+            # The conversation was cleared behind our back
+            self._reset(conversation_id)
+            state = ("", 0)
+        return state
+
+    def _reset(self, conversation_id: str) -> None:
+        self._summaries[conversation_id] = ("", 0)
+        self._epochs[conversation_id] = self._epochs.get(conversation_id, 0) + 1
+
+    def get(self, conversation_id: str, store=None) -> Tuple[str, int]:
+        """Return (summary, number of leading messages it covers)"""
+        with self._lock:
+            return self._state(conversation_id, store)
+
+    def reset(self, conversation_id: str) -> None:
+        """Forget the summary, e.g. after the conversation was cleared"""
+        with self._lock:
+            self._reset(conversation_id)
+
+    def clear(self, conversation_id: str, store) -> None:
+        """Clear the conversation and forget its summary in one step, so no fold lands in between"""
+        with self._lock:
+            self._reset(conversation_id)
+            store.clear()
+
+    def schedule(self, conversation_id: str, store) -> Optional[Future]:
+        """
+        Queue a background refresh if messages have aged out of the recent window
+
+        Args:
+            conversation_id (str): Conversation to summarize
+            store: Message source with an epoch bumped on clear, supporting len(),
+                read(start, end), read_summary() and write_summary(summary, covered, epoch),
+                e.g. ConversationStore
+
+        Returns:
+            Optional[Future]: The queued refresh, or None if there is nothing to fold yet
+        """
+        with self._lock:
+            _, covered = self._state(conversation_id, store)
+            total = len(store)
+
+            pending = self._pending.get(conversation_id)
+            if total - self.recent_messages <= covered or (pending and not pending.done()):
+                return None
+
+            epoch = self._epochs.get(conversation_id, 0)
+            future = self._executor.submit(self._fold, conversation_id, store, epoch)
+            self._pending[conversation_id] = future
+            return future
+
+    def _fold(self, conversation_id: str, store, epoch: int) -> None:
+        """Fold aged-out messages into the summary, a bounded batch per LLM call"""
+        while True:
+            with self._lock:
+                summary, start = self._state(conversation_id, store)
+                store_epoch = store.epoch
+                target = len(store) - self.recent_messages
+                if self._epochs.get(conversation_id, 0) != epoch or target <= start:
+                    return
+            end = min(target, start + self.max_fold_messages)
+
+            messages = store.read(start, end)
+            formatted = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
+
+            try:
+                updated = get_gateway().invoke(self.llm, SUMMARY_PROMPT.format(
+                    summary=summary or "(empty)",
+                    messages=formatted,
+                    max_words=int(self.max_summary_tokens * 0.75)
+                )).content.strip()
+            except Exception as e:
+                logger.error(f"Error summarizing conversation {conversation_id}: {str(e)}")
+                return
+
+            # Hard cap so the summary's prompt cost stays fixed even if the LLM ignores the limit
+            encoding = get_encoding()
+            tokens = encoding.encode(updated)
+            if len(tokens) > self.max_summary_tokens:
+                updated = encoding.decode(tokens[:self.max_summary_tokens])
+
+            with self._lock:
+                _, covered = self._summaries.get(conversation_id, ("", 0))
+                if self._epochs.get(conversation_id, 0) != epoch or covered != start:
+                    return
+                if not store.write_summary(updated, end, store_epoch):
+                    # Cleared while the LLM was summarizing the old messages
+                    self._reset(conversation_id)
+                    return
+                self._summaries[conversation_id] = (updated, end)
+            logger.info(f"Summarized messages {start}-{end} of conversation {conversation_id}")
+
+    def wait(self, conversation_id: str, timeout: Optional[float] = None) -> None:
+        """Block until the pending refresh for a conversation finishes"""
+        with self._lock:
+            pending = self._pending.get(conversation_id)
+        if pending:
+            pending.result(timeout=timeout)
@@ -0,0 +1,30 @@
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, List
+
+# Constants
+TOKENIZER_MODEL = "gpt-3.5-turbo"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str = TOKENIZER_MODEL):
+    """Return the (cached) tiktoken encoding used to measure text in tokens"""
+    from tiktoken import encoding_for_model
+
+    return encoding_for_model(model_name)
+
+
+@lru_cache(maxsize=None)
+def load_embedding_model(model_name: str = EMBEDDING_MODEL):
+    """Return the (cached, process-wide) sentence-transformer embedding model"""
+    from langchain.embeddings import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most batch_size items"""
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
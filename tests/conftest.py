@@ -0,0 +1,34 @@
+import pytest
+
+import chatbot.chunking
+import chatbot.gateway
+import chatbot.summary
+
+
+class WordEncoding:
+    """Whitespace tokenizer standing in for tiktoken, whose encodings are downloaded on first use"""
+
+    def encode(self, text):
+        return text.split()
+
+    encode_ordinary = encode
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+@pytest.fixture(autouse=True)
+def word_encoding(monkeypatch):
+    encoding = WordEncoding()
+    monkeypatch.setattr(chatbot.chunking, "get_encoding", lambda: encoding)
+    monkeypatch.setattr(chatbot.gateway, "get_encoding", lambda: encoding)
+    monkeypatch.setattr(chatbot.summary, "get_encoding", lambda: encoding)
+    return encoding
+
+
+@pytest.fixture(autouse=True)
+def fresh_gateway(monkeypatch):
+    """Give each test its own process-wide gateway so budgets and metrics do not leak"""
+    gateway = chatbot.gateway.LLMGateway(tokens_per_minute=10 ** 6)
+    monkeypatch.setattr(chatbot.summary, "get_gateway", lambda: gateway)
+    return gateway
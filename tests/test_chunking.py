@@ -0,0 +1,23 @@
+from chatbot.chunking import TokenChunker
+
+
+def words(count, prefix="w"):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def test_chunks_stay_within_budget_including_separators():
+    chunker = TokenChunker(chunk_tokens=10, overlap_tokens=0)
+    chunks = list(chunker.chunk_segments([words(3, "a"), words(3, "b"), words(3, "c")], separator=" | "))
+
+    assert chunks == ["a0 a1 a2 | b0 b1 b2", "c0 c1 c2"]
+
+
+def test_oversized_row_is_split_within_header_budget():
+    chunker = TokenChunker(chunk_tokens=10, overlap_tokens=0)
+    header = "id name"
+    chunks = list(chunker.chunk_segments(["1 ok", words(20)], separator="\n", header=header))
+
+    assert chunks[0] == "id name\n1 ok"
+    assert all(chunk.startswith(header + "\n") for chunk in chunks)
+    assert all(len(chunk.split()) <= 10 for chunk in chunks)
+    assert " ".join(chunk[len(header) + 1:] for chunk in chunks[1:]) == words(20)
@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from chatbot.gateway import LLMGateway, TokenBucket
+
+
+class RateLimitError(Exception):
+    """Shaped like the Groq client's error for an HTTP 429"""
+
+    def __init__(self, retry_after="0"):
+        super().__init__("Rate limit reached")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers={"retry-after": retry_after})
+
+
+class FakeLLM:
+    """Fails with the given errors first, then echoes the prompt"""
+
+    model_name = "fake-model"
+    temperature = 0.7
+    max_tokens = 0
+
+    def __init__(self, errors=(), latency=0.0, gate=None):
+        self.errors = list(errors)
+        self.latency = latency
+        self.gate = gate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        time.sleep(self.latency)
+        if error is not None:
+            raise error
+        return SimpleNamespace(content=f"echo: {prompt}")
+
+
+def test_identical_in_flight_prompts_share_one_call():
+    gate = threading.Event()
+    llm = FakeLLM(gate=gate)
+    gateway = LLMGateway(tokens_per_minute=10 ** 6)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(gateway.invoke, llm, "same prompt") for _ in range(5)]
+        while gateway.metrics()["requests"] < 5:
+            time.sleep(0.01)
+        gate.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert llm.calls == 1
+    assert all(result is results[0] for result in results)
+    assert gateway.metrics()["coalesced"] == 4
+
+
+def test_different_prompts_are_not_coalesced():
+    llm = FakeLLM(latency=0.05)
+    gateway = LLMGateway(tokens_per_minute=10 ** 6)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda prompt: gateway.invoke(llm, prompt), ["a", "b", "c"]))
+
+    assert llm.calls == 3
+    assert gateway.metrics()["coalesced"] == 0
+
+
+def test_followers_receive_the_leaders_error():
+    gate = threading.Event()
+    llm = FakeLLM(errors=[ValueError("boom")], gate=gate)
+    gateway = LLMGateway(tokens_per_minute=10 ** 6)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(gateway.invoke, llm, "prompt") for _ in range(3)]
+        while gateway.metrics()["requests"] < 3:
+            time.sleep(0.01)
+        gate.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    assert llm.calls == 1
+
+
+def test_rate_limit_is_retried_after_retry_after():
+    llm = FakeLLM(errors=[RateLimitError(retry_after="0.3")])
+    gateway = LLMGateway(tokens_per_minute=10 ** 6, base_backoff=0.0)
+
+    start = time.perf_counter()
+    response = gateway.invoke(llm, "prompt")
+
+    assert response.content == "echo: prompt"
+    assert time.perf_counter() - start >= 0.3
+    assert llm.calls == 2
+    metrics = gateway.metrics()
+    assert metrics["retries"] == 1 and metrics["rate_limited"] == 1 and metrics["failures"] == 0
+
+
+def test_gives_up_after_max_retries():
+    llm = FakeLLM(errors=[RateLimitError() for _ in range(3)])
+    gateway = LLMGateway(tokens_per_minute=10 ** 6, max_retries=2, base_backoff=0.0)
+
+    with pytest.raises(RateLimitError):
+        gateway.invoke(llm, "prompt")
+
+    assert llm.calls == 3
+    assert gateway.metrics()["failures"] == 1
+
+
+def test_other_errors_are_not_retried():
+    llm = FakeLLM(errors=[ValueError("bad request")])
+    gateway = LLMGateway(tokens_per_minute=10 ** 6, base_backoff=0.0)
+
+    with pytest.raises(ValueError):
+        gateway.invoke(llm, "prompt")
+
+    assert llm.calls == 1
+
+
+def test_retries_spend_token_budget():
+    # 1200 tokens per minute refill 20 tokens per second; each attempt reserves 10
+    llm = FakeLLM(errors=[RateLimitError()])
+    gateway = LLMGateway(tokens_per_minute=1200, base_backoff=0.0)
+    gateway.bucket.acquire(1190)
+    prompt = " ".join(["word"] * 10)
+
+    start = time.perf_counter()
+    gateway.invoke(llm, prompt)
+
+    assert time.perf_counter() - start >= 0.45
+
+
+def test_concurrency_is_capped():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    class CountingLLM(FakeLLM):
+        def invoke(self, prompt):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                return super().invoke(prompt)
+            finally:
+                with lock:
+                    active -= 1
+
+    llm = CountingLLM(latency=0.05)
+    gateway = LLMGateway(max_concurrency=2, tokens_per_minute=10 ** 6)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: gateway.invoke(llm, f"prompt {i}"), range(8)))
+
+    assert peak == 2
+    assert gateway.metrics()["wait_seconds_max"] > 0
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(tokens_per_minute=600)
+    bucket.acquire(600)
+
+    start = time.perf_counter()
+    bucket.acquire(5)
+
+    assert time.perf_counter() - start >= 0.45
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+import pytest
+
+from chatbot.profiles import ProfileStore, ReadWriteLock, INDEX_DIRNAME
+
+
+class FakeVectorStore:
+    """Writes a marker file where FAISS would write its index"""
+
+    def __init__(self, label, fail=False):
+        self.label = label
+        self.fail = fail
+
+    def save_local(self, path):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "index.faiss"), "w") as f:
+            f.write(self.label if not self.fail else "partial")
+        if self.fail:
+            raise OSError("disk full")
+
+
+def read_index(store, name):
+    with open(os.path.join(store.directory, name, INDEX_DIRNAME, "index.faiss")) as f:
+        return f.read()
+
+
+def test_save_replaces_index_without_leftovers(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    store.save_index("alice", FakeVectorStore("first"))
+    store.save_index("alice", FakeVectorStore("second"))
+
+    assert read_index(store, "alice") == "second"
+    assert sorted(os.listdir(tmp_path / "alice")) == [INDEX_DIRNAME]
+
+
+def test_failed_save_keeps_previous_index(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    store.save_index("alice", FakeVectorStore("first"))
+
+    with pytest.raises(OSError):
+        store.save_index("alice", FakeVectorStore("second", fail=True))
+
+    assert read_index(store, "alice") == "first"
+
+
+def test_least_recently_used_index_is_evicted(tmp_path):
+    store = ProfileStore(str(tmp_path), max_warm=2)
+    for name in ("a", "b", "c"):
+        store.save_index(name, FakeVectorStore(name))
+    store.get_index("b")
+    store.save_index("d", FakeVectorStore("d"))
+
+    assert list(store._warm) == ["b", "d"]
+
+
+def test_writer_waits_for_readers_and_blocks_new_ones():
+    lock = ReadWriteLock()
+    events = []
+    reader_inside = threading.Event()
+    release_reader = threading.Event()
+
+    def reader(name, inside=None, release=None):
+        with lock.reading():
+            if inside:
+                inside.set()
+                release.wait(timeout=5)
+            events.append(name)
+
+    def writer():
+        with lock.writing():
+            events.append("writer")
+
+    first = threading.Thread(target=reader, args=("first", reader_inside, release_reader))
+    first.start()
+    assert reader_inside.wait(timeout=5)
+    write = threading.Thread(target=writer)
+    write.start()
+    while not lock._writers_waiting:
+        time.sleep(0.01)
+    second = threading.Thread(target=reader, args=("second",))
+    second.start()
+    release_reader.set()
+    for thread in (first, write, second):
+        thread.join(timeout=5)
+
+    assert events == ["first", "writer", "second"]
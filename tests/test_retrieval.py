@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from chatbot.retrieval import BM25Index, MIN_BM25_IDF_FRACTION
+
+
+def make_index(texts):
+    index = BM25Index()
+    index.add_documents(SimpleNamespace(page_content=text, metadata={}) for text in texts)
+    return index
+
+
+def search(index, query):
+    return [doc.page_content for doc, score in index.search(query, k=10, min_idf_fraction=MIN_BM25_IDF_FRACTION)]
+
+
+def test_rare_term_passes_floor_on_tiny_corpus():
+    index = make_index([
+        "Merlin is the wizard who advises the king",
+        "The king rules the castle",
+        "The castle stands on a hill"
+    ])
+
+    assert search(index, "who is Merlin") == ["Merlin is the wizard who advises the king"]
+
+
+def test_common_term_is_dropped_on_large_corpus():
+    texts = [f"the report for region {i}" for i in range(200)] + ["the Merlin project budget"]
+    index = make_index(texts)
+
+    assert search(index, "the Merlin") == ["the Merlin project budget"]
+    assert search(index, "the") == []
+
+
+def test_merged_index_scores_like_one_built_at_once():
+    first = ["Merlin is the wizard", "The king rules the castle"]
+    second = ["The castle stands on a hill", "Merlin visits the king"]
+    merged = make_index(first)
+    merged.merge_from(make_index(second))
+    combined = make_index(first + second)
+
+    for query in ("Merlin", "castle king", "hill"):
+        assert [(doc.page_content, round(score, 6)) for doc, score in merged.search(query)] == \
+            [(doc.page_content, round(score, 6)) for doc, score in combined.search(query)]
@@ -0,0 +1,142 @@
+import threading
+from types import SimpleNamespace
+
+from chatbot.history import ConversationStore
+from chatbot.summary import ConversationSummarizer
+
+CONVERSATION_ID = "c" * 32
+
+
+class FakeLLM:
+    """Returns a numbered summary and records every prompt"""
+
+    def __init__(self, gate=None):
+        self.prompts = []
+        self.gate = gate
+        self.started = threading.Event()
+
+    def invoke(self, prompt):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        self.prompts.append(prompt)
+        return SimpleNamespace(content=f"summary {len(self.prompts)}")
+
+
+def make_store(tmp_path, count):
+    store = ConversationStore(CONVERSATION_ID, directory=str(tmp_path))
+    for i in range(count):
+        store.append("user", f"message{i}")
+    return store
+
+
+def test_folds_only_new_messages_in_bounded_batches(tmp_path):
+    store = make_store(tmp_path, 10)
+    llm = FakeLLM()
+    summarizer = ConversationSummarizer(llm, recent_messages=2, max_fold_messages=4)
+
+    summarizer.schedule(CONVERSATION_ID, store)
+    summarizer.wait(CONVERSATION_ID)
+
+    assert summarizer.get(CONVERSATION_ID) == ("summary 2", 8)
+    assert "message0" in llm.prompts[0] and "message4" not in llm.prompts[0]
+    assert "message4" in llm.prompts[1] and "message7" in llm.prompts[1]
+
+    for i in range(10, 14):
+        store.append("user", f"message{i}")
+    summarizer.schedule(CONVERSATION_ID, store)
+    summarizer.wait(CONVERSATION_ID)
+
+    assert summarizer.get(CONVERSATION_ID) == ("summary 3", 12)
+    assert "summary 2" in llm.prompts[2]
+    assert "message7" not in llm.prompts[2]
+    assert "message8" in llm.prompts[2] and "message11" in llm.prompts[2]
+
+
+def test_nothing_to_fold_within_recent_window(tmp_path):
+    store = make_store(tmp_path, 3)
+    llm = FakeLLM()
+    summarizer = ConversationSummarizer(llm, recent_messages=6)
+
+    assert summarizer.schedule(CONVERSATION_ID, store) is None
+    assert llm.prompts == []
+
+
+def test_reset_discards_fold_in_progress(tmp_path):
+    store = make_store(tmp_path, 10)
+    gate = threading.Event()
+    llm = FakeLLM(gate)
+    summarizer = ConversationSummarizer(llm, recent_messages=2)
+
+    summarizer.schedule(CONVERSATION_ID, store)
+    summarizer.reset(CONVERSATION_ID)
+    gate.set()
+    summarizer.wait(CONVERSATION_ID)
+
+    assert summarizer.get(CONVERSATION_ID) == ("", 0)
+    assert store.read_summary() == ("", 0)
+
+
+def test_cleared_conversation_starts_a_new_epoch(tmp_path):
+    store = make_store(tmp_path, 10)
+    summarizer = ConversationSummarizer(FakeLLM(), recent_messages=2)
+    summarizer.schedule(CONVERSATION_ID, store)
+    summarizer.wait(CONVERSATION_ID)
+
+    store.clear()
+    for i in range(4):
+        store.append("user", f"fresh{i}")
+    summarizer.schedule(CONVERSATION_ID, store)
+    summarizer.wait(CONVERSATION_ID)
+
+    assert summarizer.get(CONVERSATION_ID)[1] == 2
+
+
+def test_summary_survives_a_new_summarizer(tmp_path):
+    store = make_store(tmp_path, 10)
+    first = ConversationSummarizer(FakeLLM(), recent_messages=2)
+    first.schedule(CONVERSATION_ID, store)
+    first.wait(CONVERSATION_ID)
+
+    llm = FakeLLM()
+    second = ConversationSummarizer(llm, recent_messages=2)
+    assert second.get(CONVERSATION_ID, store) == first.get(CONVERSATION_ID)
+
+    store.append("user", "message10")
+    second.schedule(CONVERSATION_ID, store)
+    second.wait(CONVERSATION_ID)
+
+    assert len(llm.prompts) == 1
+    assert "message0" not in llm.prompts[0]
+    assert second.get(CONVERSATION_ID)[1] == 9
+
+
+def test_clear_elsewhere_discards_stale_summary(tmp_path):
+    store = make_store(tmp_path, 10)
+    summarizer = ConversationSummarizer(FakeLLM(), recent_messages=2)
+    summarizer.schedule(CONVERSATION_ID, store)
+    summarizer.wait(CONVERSATION_ID)
+
+    # Another tab clears the conversation and starts over without telling this summarizer
+    store.clear()
+    store.append("user", "fresh0")
+
+    assert summarizer.get(CONVERSATION_ID, store) == ("", 0)
+
+
+def test_clear_during_fold_leaves_no_summary_file(tmp_path):
+    store = make_store(tmp_path, 10)
+    gate = threading.Event()
+    llm = FakeLLM(gate)
+    summarizer = ConversationSummarizer(llm, recent_messages=2)
+
+    summarizer.schedule(CONVERSATION_ID, store)
+    assert llm.started.wait(timeout=5)
+    store.clear()
+    for i in range(10):
+        store.append("user", f"fresh{i}")
+    gate.set()
+    summarizer.wait(CONVERSATION_ID)
+
+    assert store.read_summary() == ("", 0)
+    assert summarizer.get(CONVERSATION_ID, store) == ("", 0)
@@ -1,33 +1,88 @@
 import streamlit as st
+from uuid import uuid4
 from typing import List, Dict
+from chatbot.history import ConversationStore, CONVERSATION_ID_PATTERN, open_conversation_store
 from chatbot.response import generate_response
 
+# Constants
+CHAT_WINDOW = 20          # Messages rendered by default
+CHAT_PAGE_SIZE = 20       # Older messages loaded per click
+MAX_SESSION_MESSAGES = 50 # Recent messages kept in session memory
+
+
+def get_conversation_store() -> ConversationStore:
+    """Return this session's conversation store, resuming the conversation in the URL if any"""
+    if "conversation_store" not in st.session_state:
+        conversation_id = st.query_params.get("conversation", "")
+        if not CONVERSATION_ID_PATTERN.match(conversation_id):
+            conversation_id = uuid4().hex
+            st.query_params["conversation"] = conversation_id
+
+        store = open_conversation_store(conversation_id)
+        st.session_state.conversation_store = store
+        st.session_state.messages = store.tail(MAX_SESSION_MESSAGES)
+        st.session_state.chat_window = CHAT_WINDOW
+    return st.session_state.conversation_store
+
+
+def add_message(role: str, content: str) -> None:
+    """Persist a message and keep only the recent ones in session memory"""
+    get_conversation_store().append(role, content)
+    st.session_state.messages.append({"role": role, "content": content})
+    del st.session_state.messages[:-MAX_SESSION_MESSAGES]
+
+
+def clear_messages(chatbot_manager) -> None:
+    """Clear the current conversation and its summary"""
+    store = get_conversation_store()
+    chatbot_manager.summarizer.clear(store.conversation_id, store)
+    st.session_state.messages = []
+    st.session_state.chat_window = CHAT_WINDOW
+
+
+def visible_messages(store: ConversationStore) -> List[Dict[str, str]]:
+    """Messages inside the current render window, read from disk only when older than the session cache"""
+    window = st.session_state.chat_window
+    if window <= len(st.session_state.messages):
+        return st.session_state.messages[-window:]
+    return store.tail(window)
+
+
 def display_chat_interface(chatbot_manager):
     """Display the chat interface"""
     st.title(f"💬 Chat with {chatbot_manager.config['name']}")
-    
-    # Initialize messages if not in session state
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-        
+
+    store = get_conversation_store()
+
+    # Only render the most recent messages; older ones are loaded on demand
+    hidden_count = len(store) - st.session_state.chat_window
+    if hidden_count > 0 and st.button(
+        f"Load older messages ({hidden_count} more)", key="load_older_messages", use_container_width=True
+    ):
+        st.session_state.chat_window += CHAT_PAGE_SIZE
+        st.rerun()
+
     # Display chat messages
-    for message in st.session_state.messages:
+    for message in visible_messages(store):
         with st.chat_message(message["role"]):
             st.markdown(message["content"], unsafe_allow_html=True)
-            
+
     # Chat input
     if user_input := st.chat_input("Type your message..."):
         # Add user message to chat
-        st.session_state.messages.append({"role": "user", "content": user_input})
+        add_message("user", user_input)
         with st.chat_message("user"):
             st.markdown(user_input)
-            
+
         # Generate and display assistant response
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                # Pass the entire message history to ensure context is maintained
-                response = generate_response(user_input, chatbot_manager, st.session_state.messages)
+                # Pass the recent message history to ensure context is maintained
+                response = generate_response(user_input, chatbot_manager, st.session_state.messages, store)
                 st.markdown(response, unsafe_allow_html=True)
-                
+
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
\ No newline at end of file
+        add_message("assistant", response)
+
+        # Fold turns leaving the recent window into the summary in the background
+        chatbot_manager.summarizer.schedule(store.conversation_id, store)
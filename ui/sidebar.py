@@ -1,11 +1,16 @@
 import streamlit as st
-from chatbot.processor import process_uploaded_file, fetch_webpage_content
+from chatbot.processor import ingest_upload, ingest_webpage
+from chatbot.jobs import get_job_manager
+from ui.chat import get_conversation_store, clear_messages, CHAT_WINDOW
 
 def configure_sidebar(chatbot_manager):
     """Configure the sidebar with all settings and options"""
     with st.sidebar:
         st.title("💫 Character Settings")
         
+        # Character profile selection
+        configure_profiles(chatbot_manager)
+        
         # Basic settings with explanations
         configure_basic_settings(chatbot_manager)
         
@@ -26,11 +31,37 @@ def configure_sidebar(chatbot_manager):
         configure_content_import(chatbot_manager)
         
         # Debug and reset options
-        configure_debug_options()
+        configure_debug_options(chatbot_manager)
         
         # Instructions section
         display_instructions()
 
+def configure_profiles(chatbot_manager):
+    """Select, switch and create character profiles"""
+    profiles = chatbot_manager.profiles.list_profiles()
+    selected = st.selectbox(
+        "Character Profile",
+        profiles,
+        index=profiles.index(chatbot_manager.profile_name) if chatbot_manager.profile_name in profiles else 0,
+        help="Each profile has its own settings and imported documents"
+    )
+    if selected and selected != chatbot_manager.profile_name:
+        chatbot_manager.switch_profile(selected)
+        st.rerun()
+
+    with st.expander("New Profile", expanded=False):
+        new_profile = st.text_input(
+            "Profile Name",
+            help="Letters, digits, spaces, '-' and '_'. Starts from the current settings."
+        )
+        if new_profile and st.button("Create Profile", use_container_width=True):
+            try:
+                chatbot_manager.create_profile(new_profile.strip())
+                chatbot_manager.switch_profile(new_profile.strip())
+                st.rerun()
+            except ValueError as e:
+                st.error(str(e))
+
 def configure_basic_settings(chatbot_manager):
     """Configure basic character settings"""
     with st.expander("Basic Character Information", expanded=True):
@@ -100,6 +131,12 @@ def configure_advanced_settings(chatbot_manager):
             help="Maximum length of character responses"
         )
 
+        chatbot_manager.config["extract_relevant_sentences"] = st.checkbox(
+            "Compact Retrieved Context",
+            value=chatbot_manager.config.get("extract_relevant_sentences", False),
+            help="Only send the sentences of retrieved documents that mention your question"
+        )
+
 def configure_content_import(chatbot_manager):
     """Configure content import options"""
     st.subheader("Import File Content")
@@ -114,29 +151,16 @@ def configure_content_import(chatbot_manager):
     # Ensure session state exists
     if "uploaded_file" not in st.session_state:
         st.session_state.uploaded_file = None
-        st.session_state.character_data = None
 
     # Store uploaded file in session state but don't process yet
     if uploaded_file:
         st.session_state.uploaded_file = uploaded_file
         st.success("File uploaded. Click 'Add Documents' to process.")
 
-    # Only process when the user clicks 'Add Documents'
+    # Only queue processing when the user clicks 'Add Documents'
     if st.session_state.uploaded_file and st.button("Add Documents", use_container_width=True):
-        with st.spinner("Processing file..."):
-            st.session_state.character_data = process_uploaded_file(st.session_state.uploaded_file, chatbot_manager)
-            st.success("PDF information extracted!")
-
-    # Show extracted information if available
-    if st.session_state.character_data:
-        with st.expander("Preview Extracted Information", expanded=True):
-            for key, value in st.session_state.character_data.items():
-                st.text_area(key.capitalize(), value, disabled=True, height=100)
-
-        if st.button("Apply These Settings", use_container_width=True):
-            chatbot_manager.update_config(st.session_state.character_data)
-            st.success("Settings applied! Refresh the page to see changes.")
-            st.rerun()
+        file = st.session_state.uploaded_file
+        submit_ingest_job(f"File: {file.name}", ingest_upload, chatbot_manager, file.name, file.getvalue())
 
     # Web content import section
     st.subheader("Import from Web")
@@ -146,37 +170,87 @@ def configure_content_import(chatbot_manager):
         help="Enter a URL containing character information"
     )
 
-    if "web_character_data" not in st.session_state:
-        st.session_state.web_character_data = None
-
     if web_url and st.button("Process Webpage", use_container_width=True):
-        with st.spinner("Fetching webpage content..."):
-            st.session_state.web_character_data = fetch_webpage_content(web_url, chatbot_manager)
-            if st.session_state.web_character_data:
-                st.success("Character information extracted from webpage!")
+        submit_ingest_job(f"Webpage: {web_url}", ingest_webpage, chatbot_manager, web_url)
+
+    display_ingest_jobs()
 
-    if st.session_state.web_character_data:
-        with st.expander("Preview Extracted Information", expanded=True):
-            for key, value in st.session_state.web_character_data.items():
-                st.text_area(key.capitalize(), value, disabled=True, height=100)
 
-        if st.button("Apply Web Data", use_container_width=True):
-            chatbot_manager.update_config(st.session_state.web_character_data)
-            st.success("Settings applied from web data!")
-            st.rerun()
+def submit_ingest_job(description, fn, chatbot_manager, *args):
+    """Queue an ingestion job for the current profile and remember it for this session"""
+    if "ingest_jobs" not in st.session_state:
+        st.session_state.ingest_jobs = []
+    try:
+        # Bind the profile now: the user may switch character while the job waits or extracts
+        job = get_job_manager().submit(description, fn, chatbot_manager, chatbot_manager.profile_name, *args)
+    except RuntimeError as e:
+        st.error(str(e))
+        return
+    st.session_state.ingest_jobs.append(job.id)
+    st.success("Queued for indexing; you can keep chatting meanwhile.")
+
+
+def session_ingest_jobs():
+    """This session's ingestion jobs that the job manager still tracks"""
+    job_manager = get_job_manager()
+    jobs = [job_manager.get(job_id) for job_id in st.session_state.get("ingest_jobs", [])]
+    return [job for job in jobs if job is not None]
+
+
+def display_ingest_jobs():
+    """Show this session's ingestion jobs, polling for progress only while some are running"""
+    jobs = session_ingest_jobs()
+    if any(job.active for job in jobs):
+        poll_ingest_jobs()
+    else:
+        render_ingest_jobs(jobs)
+
+
+@st.fragment(run_every=1)
+def poll_ingest_jobs():
+    jobs = session_ingest_jobs()
+    render_ingest_jobs(jobs)
+    if not any(job.active for job in jobs):
+        # Rerun the whole script so the finished list renders without this timer
+        st.rerun()
+
+
+def render_ingest_jobs(jobs):
+    if not jobs:
+        return
+
+    st.caption("Indexing jobs")
+    for job in jobs:
+        counters = ", ".join(f"{key}: {value}" for key, value in job.counters.items() if isinstance(value, int))
+        if job.status == "done":
+            summary = f"{job.result['chunks']} chunks, {job.result['duplicates_dropped']} duplicates skipped"
+            if "rows" in job.result:
+                summary = f"{job.result['rows']} rows ({job.result['rows_per_second']:.0f} rows/s), " + summary
+            st.progress(1.0, text=f"✅ {job.description} - {summary}")
+        elif job.status == "failed":
+            st.error(f"{job.description} failed: {job.error}")
+        elif job.status == "cancelled":
+            st.caption(f"⏹️ {job.description} cancelled")
+        else:
+            st.progress(job.fraction, text=f"{job.description} - {job.stage}" + (f" ({counters})" if counters else ""))
+            if st.button("Cancel", key=f"cancel_{job.id}", disabled=job.cancel_requested):
+                get_job_manager().cancel(job.id)
 
 
-def configure_debug_options():
+def configure_debug_options(chatbot_manager):
     """Configure debug and reset options"""
+    store = get_conversation_store()
     with st.expander("Debug - Chat History", expanded=False):
-        if "messages" in st.session_state and st.session_state.messages:
-            st.json(st.session_state.messages)
+        if len(store):
+            recent = st.session_state.messages[-CHAT_WINDOW:]
+            st.caption(f"Last {len(recent)} of {len(store)} messages (conversation {store.conversation_id})")
+            st.json(recent)
         else:
             st.info("No chat history available.")
     
     # Reset button
     if st.button("Reset Chat History", use_container_width=True):
-        st.session_state.messages = []
+        clear_messages(chatbot_manager)
         st.success("Chat history cleared!")
         st.rerun()
 